@@ -1,140 +1,241 @@
 # analytics_serializers.py
+import copy
+
 from rest_framework import serializers
 from django.utils import timezone
 from datetime import timedelta
 
 
-class MetricSerializer(serializers.Serializer):
+# Static tile definitions: (title, icon, color, source dict, source key)
+_QUICK_STATS_TEMPLATE = (
+    ('Total Snippets', 'code', 'blue', 'overview', 'total_snippets'),
+    ('Active Snippets', 'activity', 'green', 'overview', 'active_snippets'),
+    ('Total Views', 'eye', 'purple', 'overview', 'total_views'),
+    ('Today\'s Snippets', 'plus-circle', 'orange', 'today_metrics', 'snippets_created'),
+)
+
+_ENGAGEMENT_METRICS_DEFAULTS = {
+    'avg_session_length': '2.5 min',  # Would calculate from actual data
+    'pages_per_session': 1.8,  # Would calculate from actual data
+}
+
+_PERFORMANCE_INSIGHTS_DEFAULTS = {
+    'most_popular_action': 'shareSelectedCode',  # Would derive from data
+    'peak_usage_hour': '14:00',  # Would calculate from hourly data
+    'reliability_score': None,  # Filled in per response
+    'adoption_trend': 'growing',  # Would calculate from time series
+}
+
+
+def _has_child(field: serializers.Field) -> bool:
+    return (
+        isinstance(field, serializers.BaseSerializer)
+        or hasattr(field, 'child')
+        or hasattr(field, 'child_relation')
+    )
+
+
+class CachedFieldsSerializer(serializers.Serializer):
+    """
+    Serializer that builds its field set once per class instead of deep-copying
+    every declared field on each instantiation.
+    """
+    _fields_cache = {}
+
+    def get_fields(self):
+        cls = self.__class__
+        fields = self._fields_cache.get(cls)
+        if fields is None:
+            fields = self._fields_cache[cls] = super().get_fields()
+        # Plain fields only carry binding state, so a shallow copy is enough.
+        # Nested serializers and fields wrapping a child (ListField, DictField,
+        # ManyRelatedField) bind that child to themselves and need a deep copy.
+        return {
+            name: copy.deepcopy(field) if _has_child(field) else copy.copy(field)
+            for name, field in fields.items()
+        }
+
+
+def format_metric_value(value: float) -> str:
+    """Format numeric values for display"""
+    if value >= 1_000_000:
+        return f"{value/1_000_000:.1f}M"
+    elif value >= 1_000:
+        return f"{value/1_000:.1f}K"
+    else:
+        return str(int(value))
+
+
+class MetricSerializer(CachedFieldsSerializer):
     """Base serializer for metric data with consistent formatting"""
     value = serializers.FloatField()
     label = serializers.CharField()
     change_percent = serializers.FloatField(required=False, allow_null=True)
     trend = serializers.CharField(required=False)  # 'up', 'down', 'stable'
-    formatted_value = serializers.SerializerMethodField()
-    
-    def get_formatted_value(self, obj):
-        """Format numeric values for display"""
-        value = obj.get('value', 0)
-        if value >= 1_000_000:
-            return f"{value/1_000_000:.1f}M"
-        elif value >= 1_000:
-            return f"{value/1_000:.1f}K"
-        else:
-            return str(int(value))
-
-
-class TimeSeriesDataSerializer(serializers.Serializer):
+    formatted_value = serializers.CharField(read_only=True)
+
+    def to_representation(self, instance):
+        instance = {**instance, 'formatted_value': format_metric_value(instance.get('value', 0))}
+        return super().to_representation(instance)
+
+
+class TimeSeriesDataSerializer(CachedFieldsSerializer):
     """Serializer for time-series data points"""
     timestamp = serializers.DateTimeField()
     value = serializers.FloatField()
     label = serializers.CharField(required=False)
-    metadata = serializers.DictField(required=False)
+    metadata = serializers.JSONField(required=False)
+
+
+def _percentage_scale(total: int) -> float:
+    """Scale factor turning a count into tenths of a percent of ``total``"""
+    return 1000 / total if total > 0 else 0
+
 
+class LanguageStatsListSerializer(serializers.ListSerializer):
+    """List serializer that resolves the percentage scale once per list"""
 
-class LanguageStatsSerializer(serializers.Serializer):
+    def to_representation(self, data):
+        scale = _percentage_scale(self.context.get('total_count', 1))
+        child = self.child
+        return [
+            child.to_representation({**row, 'percentage': (row['count'] * scale + 0.5) // 1 / 10})
+            for row in data
+        ]
+
+
+class LanguageStatsSerializer(CachedFieldsSerializer):
     """Serializer for programming language statistics"""
     language = serializers.CharField()
     count = serializers.IntegerField()
-    percentage = serializers.SerializerMethodField()
+    percentage = serializers.FloatField(read_only=True)
     avg_views = serializers.FloatField(required=False)
     total_views = serializers.IntegerField(required=False)
     avg_code_length = serializers.FloatField(required=False)
     encrypted_count = serializers.IntegerField(required=False)
-    
-    def get_percentage(self, obj):
-        total = self.context.get('total_count', 1)
-        return round((obj['count'] / total) * 100, 1) if total > 0 else 0
 
+    class Meta:
+        list_serializer_class = LanguageStatsListSerializer
 
-class DashboardOverviewSerializer(serializers.Serializer):
+    def to_representation(self, instance):
+        if 'percentage' not in instance:
+            scale = _percentage_scale(self.context.get('total_count', 1))
+            instance = {**instance, 'percentage': (instance['count'] * scale + 0.5) // 1 / 10}
+        return super().to_representation(instance)
+
+
+# The fixed-shape response serializers below build their output directly in
+# to_representation rather than iterating bound fields. The field
+# declarations are kept so the response schema stays documented.
+class DashboardOverviewSerializer(CachedFieldsSerializer):
     """Main dashboard overview data"""
-    overview = serializers.DictField()
-    today_metrics = serializers.DictField()
-    changes = serializers.DictField()
+    overview = serializers.JSONField()
+    today_metrics = serializers.JSONField()
+    changes = serializers.JSONField()
     popular_languages = LanguageStatsSerializer(many=True)
-    quick_stats = serializers.SerializerMethodField()
+    quick_stats = serializers.JSONField(read_only=True)
+
+    def to_representation(self, instance):
+        return {
+            'overview': instance['overview'],
+            'today_metrics': instance['today_metrics'],
+            'changes': instance['changes'],
+            'popular_languages': self.fields['popular_languages'].to_representation(
+                instance['popular_languages']
+            ),
+            'quick_stats': self.get_quick_stats(instance),
+        }
     
-    def get_quick_stats(self, obj):
-        overview = obj.get('overview', {})
-        today = obj.get('today_metrics', {})
-        
+    def get_quick_stats(self, obj: dict) -> list[dict]:
+        sources = {
+            'overview': obj.get('overview', {}),
+            'today_metrics': obj.get('today_metrics', {}),
+        }
         return [
-            {
-                'title': 'Total Snippets',
-                'value': overview.get('total_snippets', 0),
-                'icon': 'code',
-                'color': 'blue'
-            },
-            {
-                'title': 'Active Snippets',
-                'value': overview.get('active_snippets', 0),
-                'icon': 'activity',
-                'color': 'green'
-            },
-            {
-                'title': 'Total Views',
-                'value': overview.get('total_views', 0),
-                'icon': 'eye',
-                'color': 'purple'
-            },
-            {
-                'title': 'Today\'s Snippets',
-                'value': today.get('snippets_created', 0),
-                'icon': 'plus-circle',
-                'color': 'orange'
-            }
+            {'title': title, 'value': sources[source].get(key, 0), 'icon': icon, 'color': color}
+            for title, icon, color, source, key in _QUICK_STATS_TEMPLATE
         ]
 
 
-class UserBehaviorSerializer(serializers.Serializer):
+class UserBehaviorSerializer(CachedFieldsSerializer):
     """User behavior analytics data"""
     period = serializers.CharField()
-    visitor_metrics = serializers.DictField()
-    hourly_patterns = TimeSeriesDataSerializer(many=True)
-    location_distribution = serializers.ListField()
-    browser_distribution = serializers.ListField()
-    engagement_metrics = serializers.SerializerMethodField()
+    visitor_metrics = serializers.JSONField()
+    hourly_patterns = serializers.ListField(child=serializers.DictField())
+    location_distribution = serializers.JSONField()
+    browser_distribution = serializers.JSONField()
+    engagement_metrics = serializers.JSONField(read_only=True)
+
+    def to_representation(self, instance):
+        return {
+            'period': instance['period'],
+            'visitor_metrics': instance['visitor_metrics'],
+            'hourly_patterns': instance['hourly_patterns'],
+            'location_distribution': instance['location_distribution'],
+            'browser_distribution': instance['browser_distribution'],
+            'engagement_metrics': self.get_engagement_metrics(instance),
+        }
     
-    def get_engagement_metrics(self, obj):
+    def get_engagement_metrics(self, obj: dict) -> dict:
         visitor_metrics = obj.get('visitor_metrics', {})
         return {
             'bounce_rate': 100 - visitor_metrics.get('return_rate', 0),
-            'avg_session_length': '2.5 min',  # Would calculate from actual data
-            'pages_per_session': 1.8,  # Would calculate from actual data
+            **_ENGAGEMENT_METRICS_DEFAULTS,
         }
 
 
-class VSCodeAnalyticsSerializer(serializers.Serializer):
+class VSCodeAnalyticsSerializer(CachedFieldsSerializer):
     """VS Code extension analytics"""
     period = serializers.CharField()
-    daily_activity = TimeSeriesDataSerializer(many=True)
-    event_distribution = serializers.ListField()
-    version_distribution = serializers.ListField()
+    daily_activity = serializers.ListField(child=serializers.DictField())
+    event_distribution = serializers.JSONField()
+    version_distribution = serializers.JSONField()
     language_usage = LanguageStatsSerializer(many=True)
-    error_analysis = serializers.ListField()
-    summary = serializers.DictField()
-    performance_insights = serializers.SerializerMethodField()
-    
-    def get_performance_insights(self, obj):
-        summary = obj.get('summary', {})
+    error_analysis = serializers.JSONField()
+    summary = serializers.JSONField()
+    performance_insights = serializers.JSONField(read_only=True)
+
+    def to_representation(self, instance):
         return {
-            'most_popular_action': 'shareSelectedCode',  # Would derive from data
-            'peak_usage_hour': '14:00',  # Would calculate from hourly data
-            'reliability_score': max(0, 100 - summary.get('error_rate', 0)),
-            'adoption_trend': 'growing'  # Would calculate from time series
+            'period': instance['period'],
+            'daily_activity': instance['daily_activity'],
+            'event_distribution': instance['event_distribution'],
+            'version_distribution': instance['version_distribution'],
+            'language_usage': self.fields['language_usage'].to_representation(
+                instance['language_usage']
+            ),
+            'error_analysis': instance['error_analysis'],
+            'summary': instance['summary'],
+            'performance_insights': self.get_performance_insights(instance),
         }
+    
+    def get_performance_insights(self, obj: dict) -> dict:
+        summary = obj.get('summary', {})
+        insights = dict(_PERFORMANCE_INSIGHTS_DEFAULTS)
+        insights['reliability_score'] = max(0, 100 - summary.get('error_rate', 0))
+        return insights
 
 
-class PerformanceMetricsSerializer(serializers.Serializer):
+class PerformanceMetricsSerializer(CachedFieldsSerializer):
     """System performance metrics"""
     period = serializers.CharField()
-    snippet_lifecycle = serializers.DictField()
-    content_metrics = serializers.DictField()
-    versioning_metrics = serializers.DictField()
-    usage_patterns = serializers.DictField()
-    optimization_suggestions = serializers.SerializerMethodField()
+    snippet_lifecycle = serializers.JSONField()
+    content_metrics = serializers.JSONField()
+    versioning_metrics = serializers.JSONField()
+    usage_patterns = serializers.JSONField()
+    optimization_suggestions = serializers.JSONField(read_only=True)
+
+    def to_representation(self, instance):
+        return {
+            'period': instance['period'],
+            'snippet_lifecycle': instance['snippet_lifecycle'],
+            'content_metrics': instance['content_metrics'],
+            'versioning_metrics': instance['versioning_metrics'],
+            'usage_patterns': instance['usage_patterns'],
+            'optimization_suggestions': self.get_optimization_suggestions(instance),
+        }
     
-    def get_optimization_suggestions(self, obj):
+    def get_optimization_suggestions(self, obj: dict) -> list[dict]:
         lifecycle = obj.get('snippet_lifecycle', {})
         content = obj.get('content_metrics', {})
         
@@ -157,16 +258,28 @@ class PerformanceMetricsSerializer(serializers.Serializer):
         return suggestions
 
 
-class RealTimeMetricsSerializer(serializers.Serializer):
+class RealTimeMetricsSerializer(CachedFieldsSerializer):
     """Real-time dashboard metrics"""
     timestamp = serializers.DateTimeField()
-    recent_activity = serializers.DictField()
+    recent_activity = serializers.JSONField()
     trending_languages = LanguageStatsSerializer(many=True)
     active_users_estimate = serializers.IntegerField()
-    health_metrics = serializers.DictField()
-    alerts = serializers.SerializerMethodField()
+    health_metrics = serializers.JSONField()
+    alerts = serializers.JSONField(read_only=True)
+
+    def to_representation(self, instance):
+        return {
+            'timestamp': instance['timestamp'],
+            'recent_activity': instance['recent_activity'],
+            'trending_languages': self.fields['trending_languages'].to_representation(
+                instance['trending_languages']
+            ),
+            'active_users_estimate': instance['active_users_estimate'],
+            'health_metrics': instance['health_metrics'],
+            'alerts': self.get_alerts(instance),
+        }
     
-    def get_alerts(self, obj):
+    def get_alerts(self, obj: dict) -> list[dict]:
         health = obj.get('health_metrics', {})
         alerts = []
         
@@ -175,22 +288,22 @@ class RealTimeMetricsSerializer(serializers.Serializer):
             alerts.append({
                 'level': 'error' if error_rate > 10 else 'warning',
                 'message': f'High error rate: {error_rate}%',
-                'timestamp': timezone.now().isoformat()
+                'timestamp': timezone.now()
             })
         
         return alerts
 
 
-class CustomAnalyticsSerializer(serializers.Serializer):
+class CustomAnalyticsSerializer(CachedFieldsSerializer):
     """Custom analytics query results"""
     query_type = serializers.CharField()
     period_days = serializers.IntegerField(required=False)
-    results = serializers.ListField()
-    summary = serializers.DictField(required=False)
-    metadata = serializers.DictField(required=False)
+    results = serializers.JSONField()
+    summary = serializers.JSONField(required=False)
+    metadata = serializers.JSONField(required=False)
 
 
-class AnalyticsExportSerializer(serializers.Serializer):
+class AnalyticsExportSerializer(CachedFieldsSerializer):
     """Serializer for data export functionality"""
     format = serializers.ChoiceField(choices=['csv', 'json', 'excel'])
     date_range = serializers.DictField()
@@ -198,7 +311,7 @@ class AnalyticsExportSerializer(serializers.Serializer):
     filters = serializers.DictField(required=False)
 
 
-class AlertConfigSerializer(serializers.Serializer):
+class AlertConfigSerializer(CachedFieldsSerializer):
     """Configuration for analytics alerts"""
     metric_name = serializers.CharField()
     threshold_value = serializers.FloatField()
@@ -208,47 +321,47 @@ class AlertConfigSerializer(serializers.Serializer):
 
 
 # Response wrapper serializers for consistent API responses
-class AnalyticsResponseSerializer(serializers.Serializer):
+class AnalyticsResponseSerializer(CachedFieldsSerializer):
     """Standard wrapper for all analytics responses"""
     success = serializers.BooleanField(default=True)
-    data = serializers.DictField()
-    metadata = serializers.DictField(required=False)
+    data = serializers.JSONField()
+    metadata = serializers.JSONField(required=False)
     timestamp = serializers.DateTimeField(default=timezone.now)
-    cache_info = serializers.DictField(required=False)
+    cache_info = serializers.JSONField(required=False)
 
 
-class ErrorResponseSerializer(serializers.Serializer):
+class ErrorResponseSerializer(CachedFieldsSerializer):
     """Standard error response format"""
     success = serializers.BooleanField(default=False)
     error = serializers.CharField()
     error_code = serializers.CharField(required=False)
-    details = serializers.DictField(required=False)
+    details = serializers.JSONField(required=False)
     timestamp = serializers.DateTimeField(default=timezone.now)
 
 
 # Utility serializers for common data structures
-class ChartDataSerializer(serializers.Serializer):
+class ChartDataSerializer(CachedFieldsSerializer):
     """Standardized chart data format"""
     chart_type = serializers.ChoiceField(
         choices=['line', 'bar', 'pie', 'doughnut', 'area', 'scatter']
     )
     title = serializers.CharField()
-    datasets = serializers.ListField()
-    labels = serializers.ListField()
-    options = serializers.DictField(required=False)
+    datasets = serializers.JSONField()
+    labels = serializers.JSONField()
+    options = serializers.JSONField(required=False)
 
 
-class TableDataSerializer(serializers.Serializer):
+class TableDataSerializer(CachedFieldsSerializer):
     """Standardized table data format"""
-    headers = serializers.ListField()
-    rows = serializers.ListField()
-    pagination = serializers.DictField(required=False)
-    sorting = serializers.DictField(required=False)
+    headers = serializers.JSONField()
+    rows = serializers.JSONField()
+    pagination = serializers.JSONField(required=False)
+    sorting = serializers.JSONField(required=False)
 
 
-class FilterOptionsSerializer(serializers.Serializer):
+class FilterOptionsSerializer(CachedFieldsSerializer):
     """Available filter options for analytics"""
-    date_ranges = serializers.ListField()
-    languages = serializers.ListField()
-    metrics = serializers.ListField()
-    custom_filters = serializers.DictField(required=False)
\ No newline at end of file
+    date_ranges = serializers.JSONField()
+    languages = serializers.JSONField()
+    metrics = serializers.JSONField()
+    custom_filters = serializers.JSONField(required=False)
\ No newline at end of file
@@ -1,3 +1,42 @@
+from datetime import timedelta
+
 from django.test import TestCase
+from django.utils import timezone
+
+from snippets.models import Snippet, SnippetDailyMetrics
+
+from .views import SnippetAnalyticsView
+
+
+class SnippetAnalyticsLanguageStatsTests(TestCase):
+    def make_snippet(self, language, created_at, view_count):
+        snippet = Snippet.objects.create(
+            content='x', language=language, expires_at=created_at + timedelta(days=30)
+        )
+        Snippet.objects.filter(pk=snippet.pk).update(created_at=created_at, view_count=view_count)
+
+    def test_language_totals_include_views_after_creation_day(self):
+        day = timezone.localdate() - timedelta(days=2)
+        start, _ = SnippetDailyMetrics.day_bounds(day)
+        self.make_snippet('python', start + timedelta(hours=1), 2)
+        self.make_snippet('python', start + timedelta(hours=2), 4)
+        self.make_snippet('go', start + timedelta(hours=3), 1)
+        SnippetDailyMetrics.rollup(day)
+
+        # Views keep arriving after the creation day has been rolled up
+        Snippet.objects.filter(language='python').update(view_count=10)
+
+        stats = SnippetAnalyticsView()._build_payload('7d')['language_stats']
+
+        self.assertEqual(
+            [(row['language'], row['count'], row['total_views'], row['avg_views']) for row in stats],
+            [('python', 2, 20, 10.0), ('go', 1, 1, 1.0)],
+        )
+
+    def test_language_totals_exclude_snippets_before_period(self):
+        self.make_snippet('python', timezone.now() - timedelta(days=1), 3)
+        self.make_snippet('python', timezone.now() - timedelta(days=40), 100)
+
+        stats = SnippetAnalyticsView()._build_payload('7d')['language_stats']
 
-# Create your tests here.
+        self.assertEqual([(row['count'], row['total_views']) for row in stats], [(1, 3)])
@@ -1,79 +1,175 @@
 # analytics/views.py - VALIDATED & CORRECTED VERSION
 
-from datetime import timedelta, date
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time, timedelta, date
+from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
-from django.db import models, connection
-from django.db.models import Count, Sum, Avg, Max, Min, F, Q, Case, When, Value
-from django.db.models.functions import TruncDate, TruncWeek, TruncMonth, TruncHour, Length, Extract
+from django.http import Http404
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.cache import cache_page
+from django.views.decorators.vary import vary_on_headers
+from django.db import models, connections
+from django.db.models import Aggregate, Count, Sum, Avg, Max, Min, F, Q, ExpressionWrapper
+from django.db.models.functions import TruncDate, TruncWeek, TruncMonth, TruncHour, Extract, ExtractHour
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from snippets import realtime
 from snippets.models import (
     Snippet, SnippetView, SnippetMetrics, VSCodeExtensionMetrics, 
-    VSCodeTelemetryEvent, SnippetDiff
+    VSCodeTelemetryEvent, SnippetDiff, SnippetDailyMetrics, SnippetViewDailyMetrics,
+    VisitorStats
 )
 
 
+# Short TTL for aggregate payloads; dashboards tolerate a minute of staleness.
+ANALYTICS_CACHE_TIMEOUT = 60
+
+# Content analysis is built from rollups refreshed every 5 minutes, so
+# cached payloads simply expire rather than being invalidated on write.
+CONTENT_ANALYSIS_CACHE_PREFIX = "content_analysis"
+CONTENT_ANALYSIS_CACHE_TIMEOUT = 300
+
+# Rollup rows are reshaped as they stream in rather than cached on the queryset
+# first, so period='all' responses hold one copy of the rows, not two.
+ROLLUP_CHUNK_SIZE = 2000
+
+# Upper bound on threads a single payload fans its independent queries out to.
+ANALYTICS_QUERY_WORKERS = 8
+
+# The earliest row in a table only moves when old data is purged.
+EARLIEST_DATE_CACHE_TIMEOUT = 60 * 60
+
+
+def day_start(day):
+    """
+    Aware midnight at the start of ``day`` in the current timezone. Filtering
+    with ``field__gte=day_start(d)`` matches ``field__date__gte=d`` but stays
+    sargable on the plain timestamp index.
+    """
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+class ApproxCountDistinct(Aggregate):
+    """HyperLogLog cardinality estimate from the postgresql-hll extension"""
+    template = 'hll_cardinality(hll_add_agg(hll_hash_text(%(expressions)s)))::bigint'
+    output_field = models.BigIntegerField()
+
+
+def count_distinct(field):
+    """Exact COUNT(DISTINCT field), or an HLL estimate when ANALYTICS_APPROX_DISTINCT is on"""
+    if settings.ANALYTICS_APPROX_DISTINCT:
+        return ApproxCountDistinct(field)
+    return Count(field, distinct=True)
+
+
+# Shared by every request in the process so worker threads are reused rather
+# than rebuilt. Queries on these threads run on their own connections, outside
+# any transaction the calling request has open.
+_query_pool = ThreadPoolExecutor(
+    max_workers=ANALYTICS_QUERY_WORKERS, thread_name_prefix="analytics-query"
+)
+
+
+def _evaluate(query):
+    """
+    Run one query on a pool thread. The thread's connection is closed
+    afterwards, even under CONN_MAX_AGE, so idle pool threads don't each hold
+    a persistent connection on top of the request threads'.
+    """
+    try:
+        return query() if callable(query) else list(query)
+    finally:
+        connections.close_all()
+
+
+def fetch_concurrently(**queries):
+    """
+    Evaluate independent querysets (or callables returning aggregates) in
+    parallel so a payload costs max(query time) rather than the sum.
+    """
+    futures = {name: _query_pool.submit(_evaluate, query) for name, query in queries.items()}
+    return {name: future.result() for name, future in futures.items()}
+
+
+def earliest_date(model, field):
+    """Date of the oldest ``field`` value in ``model``, or None if the table is empty."""
+    def lookup():
+        value = model.objects.order_by(field).values_list(field, flat=True).first()
+        return value.date() if value else None
+
+    key = f"analytics:earliest:{model._meta.db_table}.{field}"
+    return cache.get_or_set(key, lookup, EARLIEST_DATE_CACHE_TIMEOUT)
+
+
 class AnalyticsDashboardView(APIView):
     """
     Main dashboard overview with key metrics
     """
+    @method_decorator(cache_page(ANALYTICS_CACHE_TIMEOUT))
+    @method_decorator(vary_on_headers('Authorization'))
     def get(self, request):
+        return Response(self._build_payload())
+
+    def _build_payload(self):
         now = timezone.now()
         today = now.date()
         yesterday = today - timedelta(days=1)
         week_ago = today - timedelta(days=7)
+        today_start = day_start(today)
+        yesterday_start = day_start(yesterday)
         
-        # Overview metrics
-        total_snippets = Snippet.objects.count()
-        active_snippets = Snippet.objects.filter(expires_at__gt=now).count()
-        total_views = SnippetView.objects.count()
-        
-        # Today's metrics
-        today_snippets = Snippet.objects.filter(created_at__date=today).count()
-        today_views = SnippetView.objects.filter(viewed_at__date=today).count()
+        # Overview, today and yesterday counters in one pass per table
+        snippet_counts = Snippet.objects.aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(expires_at__gt=now)),
+            today=Count('id', filter=Q(created_at__gte=today_start)),
+            yesterday=Count('id', filter=Q(created_at__gte=yesterday_start, created_at__lt=today_start)),
+            encrypted=Count('id', filter=Q(is_encrypted=True)),
+            password=Count('id', filter=Q(is_password_protected=True)),
+            avg_views=Avg('view_count'),
+        )
+        view_counts = SnippetView.objects.aggregate(
+            total=Count('id'),
+            today=Count('id', filter=Q(viewed_at__gte=today_start)),
+            yesterday=Count('id', filter=Q(viewed_at__gte=yesterday_start, viewed_at__lt=today_start)),
+        )
         
-        # Yesterday comparison
-        yesterday_snippets = Snippet.objects.filter(created_at__date=yesterday).count()
-        yesterday_views = SnippetView.objects.filter(viewed_at__date=yesterday).count()
+        today_snippets = snippet_counts['today']
+        today_views = view_counts['today']
         
         # Calculate percentage changes
-        snippet_change = self._calculate_percentage_change(today_snippets, yesterday_snippets)
-        view_change = self._calculate_percentage_change(today_views, yesterday_views)
+        snippet_change = self._calculate_percentage_change(today_snippets, snippet_counts['yesterday'])
+        view_change = self._calculate_percentage_change(today_views, view_counts['yesterday'])
         
-        # Language popularity (last 7 days)
+        # Language popularity (last 7 days), read from the daily rollup
         popular_languages = list(
-            Snippet.objects
-            .filter(created_at__date__gte=week_ago)
+            SnippetDailyMetrics.objects
+            .filter(date__gte=week_ago)
             .values('language')
-            .annotate(count=Count('id'))
+            .annotate(count=Sum('created'))
             .order_by('-count')[:10]
         )
         
         # VS Code metrics
         vscode_today = VSCodeTelemetryEvent.objects.filter(
-            timestamp__date=today
-        ).count()
-        
-        # Encryption usage
-        encrypted_snippets = Snippet.objects.filter(is_encrypted=True).count()
-        password_protected = Snippet.objects.filter(
-            password_hash__isnull=False
+            timestamp__gte=today_start,
+            timestamp__lt=day_start(today + timedelta(days=1))
         ).count()
         
-        # Average views per snippet
-        avg_views = SnippetView.objects.aggregate(
-            avg_views=Avg('snippet__view_count')
-        )['avg_views'] or 0
+        # Average views per snippet, read off the denormalized counter
+        avg_views = snippet_counts['avg_views'] or 0
         
-        return Response({
+        return {
             'overview': {
-                'total_snippets': total_snippets,
-                'active_snippets': active_snippets,
-                'total_views': total_views,
+                'total_snippets': snippet_counts['total'],
+                'active_snippets': snippet_counts['active'],
+                'total_views': view_counts['total'],
                 'avg_views_per_snippet': round(avg_views, 2),
-                'encrypted_snippets': encrypted_snippets,
-                'password_protected_snippets': password_protected,
+                'encrypted_snippets': snippet_counts['encrypted'],
+                'password_protected_snippets': snippet_counts['password'],
             },
             'today': {
                 'snippets_created': today_snippets,
@@ -85,7 +181,7 @@ class AnalyticsDashboardView(APIView):
                 'views_change_percent': view_change,
             },
             'popular_languages': popular_languages,
-        })
+        }
     
     def _calculate_percentage_change(self, current, previous):
         if previous == 0:
@@ -97,31 +193,41 @@ class SnippetAnalyticsView(APIView):
     """
     Detailed snippet analytics and trends
     """
+    @method_decorator(cache_page(ANALYTICS_CACHE_TIMEOUT))
+    @method_decorator(vary_on_headers('Authorization'))
     def get(self, request):
         period = request.query_params.get('period', '7d')  # 7d, 30d, 90d, all
-        
+        return Response(self._build_payload(period))
+
+    def _build_payload(self, period):
         # Get date range and truncation function
         start_date, trunc_func = self._get_date_range_and_trunc(period)
         
-        # Daily/Weekly/Monthly snippet creation trends
-        creation_trends = list(
-            Snippet.objects
-            .filter(created_at__date__gte=start_date)
-            .annotate(period=trunc_func('created_at'))
-            .values('period')
-            .annotate(
-                count=Count('id'),
-                encrypted_count=Count('id', filter=Q(is_encrypted=True)),
-                password_protected_count=Count('id', filter=Q(password_hash__isnull=False)),
-                one_time_view_count=Count('id', filter=Q(one_time_view=True))
+        daily_metrics = SnippetDailyMetrics.objects.filter(date__gte=start_date)
+        
+        # Daily/Weekly/Monthly snippet creation trends, read from the daily rollup
+        creation_trends = [
+            dict(row, period=self._as_period(row['period'], trunc_func))
+            for row in (
+                daily_metrics
+                .values(period=self._rollup_bucket(trunc_func))
+                .annotate(
+                    count=Sum('created'),
+                    encrypted_count=Sum('encrypted'),
+                    password_protected_count=Sum('password_protected'),
+                    one_time_view_count=Sum('one_time')
+                )
+                .order_by('period')
+                .iterator(chunk_size=ROLLUP_CHUNK_SIZE)
             )
-            .order_by('period')
-        )
+        ]
         
-        # Language distribution
+        # Language distribution. Views keep accruing for the snippet's whole
+        # lifetime, so they are read live rather than from the rollup, which
+        # only captures view_count as of the creation day's last refresh
         language_stats = list(
             Snippet.objects
-            .filter(created_at__date__gte=start_date)
+            .filter(created_at__gte=day_start(start_date))
             .values('language')
             .annotate(
                 count=Count('id'),
@@ -134,40 +240,58 @@ class SnippetAnalyticsView(APIView):
         # Snippet lifetime analysis
         expired_snippets = Snippet.objects.filter(
             expires_at__lt=timezone.now(),
-            created_at__date__gte=start_date
+            created_at__gte=day_start(start_date)
         ).count()
         
         # View patterns
-        view_patterns = list(
-            SnippetView.objects
-            .filter(viewed_at__date__gte=start_date)
-            .annotate(period=trunc_func('viewed_at'))
-            .values('period')
-            .annotate(count=Count('id'))
-            .order_by('period')
-        )
+        view_patterns = [
+            dict(row, period=self._as_period(row['period'], trunc_func))
+            for row in (
+                SnippetViewDailyMetrics.objects
+                .filter(date__gte=start_date, views__gt=0)
+                .values(period=self._rollup_bucket(trunc_func))
+                .annotate(count=Sum('views'))
+                .order_by('period')
+                .iterator(chunk_size=ROLLUP_CHUNK_SIZE)
+            )
+        ]
         
-        # Top performing snippets
+        # Top performing snippets, ranked by the denormalized view counter
         top_snippets = list(
             Snippet.objects
-            .filter(created_at__date__gte=start_date)
-            .annotate(view_count_actual=Count('views'))
-            .order_by('-view_count_actual')[:10]
-            .values('id', 'language', 'created_at', 'view_count_actual', 'is_encrypted')
+            .filter(created_at__gte=day_start(start_date))
+            .order_by('-view_count')
+            .values('id', 'language', 'created_at', 'is_encrypted', view_count_actual=F('view_count'))[:10]
         )
         
-        return Response({
+        total_created = sum(item['count'] for item in creation_trends)
+        
+        return {
             'period': period,
             'creation_trends': creation_trends,
             'language_stats': language_stats,
             'view_patterns': view_patterns,
             'top_snippets': top_snippets,
             'summary': {
-                'total_created': sum(item['count'] for item in creation_trends),
+                'total_created': total_created,
                 'total_expired': expired_snippets,
                 'most_popular_language': language_stats[0]['language'] if language_stats else None,
             }
-        })
+        }
+    
+    @staticmethod
+    def _rollup_bucket(trunc_func):
+        """Bucket expression over the rollup tables' date column"""
+        if trunc_func is TruncDate:
+            return F('date')
+        return trunc_func('date')
+    
+    @staticmethod
+    def _as_period(value, trunc_func):
+        """Match the type a live Trunc over a DateTimeField would have returned"""
+        if trunc_func is TruncDate:
+            return value
+        return timezone.make_aware(datetime.combine(value, time.min))
     
     def _get_date_range_and_trunc(self, period):
         """Helper method to get date range and truncation function"""
@@ -184,10 +308,8 @@ class SnippetAnalyticsView(APIView):
             trunc_func = TruncWeek
         elif period == 'all':
             # For all time, get the earliest snippet date
-            earliest_snippet = Snippet.objects.order_by('created_at').first()
-            if earliest_snippet:
-                start_date = earliest_snippet.created_at.date()
-            else:
+            start_date = earliest_date(Snippet, 'created_at')
+            if start_date is None:
                 # Fallback if no snippets exist
                 start_date = end_date - timedelta(days=365)
             trunc_func = TruncMonth  # Use monthly grouping for all-time data
@@ -212,8 +334,8 @@ class UserBehaviorAnalyticsView(APIView):
         # View patterns by hour of day
         hourly_views = list(
             SnippetView.objects
-            .filter(viewed_at__date__gte=start_date)
-            .extra(select={'hour': 'EXTRACT(hour FROM viewed_at)'})
+            .filter(viewed_at__gte=day_start(start_date))
+            .annotate(hour=ExtractHour('viewed_at'))
             .values('hour')
             .annotate(count=Count('id'))
             .order_by('hour')
@@ -223,7 +345,7 @@ class UserBehaviorAnalyticsView(APIView):
         location_stats = list(
             SnippetView.objects
             .filter(
-                viewed_at__date__gte=start_date,
+                viewed_at__gte=day_start(start_date),
                 location__isnull=False
             )
             .exclude(location='')
@@ -232,54 +354,34 @@ class UserBehaviorAnalyticsView(APIView):
             .order_by('-count')[:20]
         )
         
-        # Browser distribution using raw SQL
-        with connection.cursor() as cursor:
-            cursor.execute("""
-                SELECT 
-                    CASE 
-                        WHEN user_agent LIKE %s THEN 'Chrome'
-                        WHEN user_agent LIKE %s THEN 'Firefox'
-                        WHEN user_agent LIKE %s THEN 'Safari'
-                        WHEN user_agent LIKE %s THEN 'Edge'
-                        ELSE 'Other'
-                    END as browser,
-                    COUNT(*) as count
-                FROM snippet_views 
-                WHERE viewed_at >= %s
-                GROUP BY browser
-                ORDER BY count DESC
-            """, ['%Chrome%', '%Firefox%', '%Safari%', '%Edge%', start_date])
-            
-            browser_results = cursor.fetchall()
-            user_agent_stats = [
-                {'browser': row[0], 'count': row[1]} 
-                for row in browser_results
-            ]
-        
-        # Unique visitors (based on IP hash)
-        unique_visitors = (
+        # Browser distribution, classified at ingest time
+        user_agent_stats = list(
             SnippetView.objects
-            .filter(viewed_at__date__gte=start_date)
-            .values('ip_hash')
-            .distinct()
-            .count()
+            .filter(viewed_at__gte=day_start(start_date))
+            .values('browser')
+            .annotate(count=Count('id'))
+            .order_by('-count')
         )
         
-        # Return vs new visitors
-        returning_visitors = (
+        # Unique and returning visitors (based on IP hash) from one grouped pass
+        visitors = (
             SnippetView.objects
-            .filter(viewed_at__date__gte=start_date)
+            .filter(viewed_at__gte=day_start(start_date))
             .values('ip_hash')
             .annotate(visit_count=Count('id'))
-            .filter(visit_count__gt=1)
-            .count()
+            .aggregate(
+                unique=Count('ip_hash'),
+                returning=Count('ip_hash', filter=Q(visit_count__gt=1))
+            )
         )
+        unique_visitors = visitors['unique']
+        returning_visitors = visitors['returning']
         
         # One-time view usage
         one_time_views = (
             Snippet.objects
             .filter(
-                created_at__date__gte=start_date,
+                created_at__gte=day_start(start_date),
                 one_time_view=True
             )
             .aggregate(
@@ -318,11 +420,7 @@ class UserBehaviorAnalyticsView(APIView):
             return end_date - timedelta(days=90)
         elif period == 'all':
             # For all time, get the earliest view date
-            earliest_view = SnippetView.objects.order_by('viewed_at').first()
-            if earliest_view:
-                return earliest_view.viewed_at.date()
-            else:
-                return end_date - timedelta(days=365)
+            return earliest_date(SnippetView, 'viewed_at') or end_date - timedelta(days=365)
         else:
             return end_date - timedelta(days=30)
 
@@ -331,21 +429,25 @@ class VSCodeAnalyticsView(APIView):
     """
     VS Code extension analytics and metrics
     """
+    @method_decorator(cache_page(ANALYTICS_CACHE_TIMEOUT))
+    @method_decorator(vary_on_headers('Authorization'))
     def get(self, request):
         period = request.query_params.get('period', '30d')
-        
+        return Response(self._build_payload(period))
+
+    def _build_payload(self, period):
         # Get date range and truncation function
         start_date, trunc_func = self._get_date_range_and_trunc(period)
         
         # Daily VS Code activity
-        daily_activity = list(
+        daily_activity = (
             VSCodeTelemetryEvent.objects
-            .filter(timestamp__date__gte=start_date)
+            .filter(timestamp__gte=day_start(start_date))
             .annotate(date=trunc_func('timestamp'))
             .values('date')
             .annotate(
                 total_events=Count('id'),
-                unique_clients=Count('client_id', distinct=True),
+                unique_clients=count_distinct('client_id'),
                 selection_shares=Count('id', filter=Q(event_name='shareSelectedCode')),
                 file_shares=Count('id', filter=Q(event_name='shareEntireFile')),
                 errors=Count('id', filter=Q(event_name='shareError'))
@@ -354,19 +456,19 @@ class VSCodeAnalyticsView(APIView):
         )
         
         # Event type distribution
-        event_distribution = list(
+        event_distribution = (
             VSCodeTelemetryEvent.objects
-            .filter(timestamp__date__gte=start_date)
+            .filter(timestamp__gte=day_start(start_date))
             .values('event_name')
             .annotate(count=Count('id'))
             .order_by('-count')
         )
         
         # VS Code version distribution
-        version_distribution = list(
+        version_distribution = (
             VSCodeTelemetryEvent.objects
             .filter(
-                timestamp__date__gte=start_date,
+                timestamp__gte=day_start(start_date),
                 vs_code_version__isnull=False
             )
             .values('vs_code_version')
@@ -375,10 +477,10 @@ class VSCodeAnalyticsView(APIView):
         )
         
         # Language usage in VS Code
-        language_usage = list(
+        language_usage = (
             VSCodeTelemetryEvent.objects
             .filter(
-                timestamp__date__gte=start_date,
+                timestamp__gte=day_start(start_date),
                 language__isnull=False
             )
             .values('language')
@@ -390,10 +492,10 @@ class VSCodeAnalyticsView(APIView):
         )
         
         # Error analysis
-        error_analysis = list(
+        error_analysis = (
             VSCodeTelemetryEvent.objects
             .filter(
-                timestamp__date__gte=start_date,
+                timestamp__gte=day_start(start_date),
                 event_name='shareError',
                 error_message__isnull=False
             )
@@ -402,48 +504,47 @@ class VSCodeAnalyticsView(APIView):
             .order_by('-count')[:10]
         )
         
-        # Active users and retention
-        total_clients = (
-            VSCodeTelemetryEvent.objects
-            .filter(timestamp__date__gte=start_date)
-            .values('client_id')
-            .distinct()
-            .count()
-        )
-        
-        # Code length statistics
-        code_stats = (
-            VSCodeTelemetryEvent.objects
-            .filter(
-                timestamp__date__gte=start_date,
-                code_length__isnull=False
-            )
-            .aggregate(
-                avg_length=Avg('code_length'),
-                min_length=Min('code_length'),
-                max_length=Max('code_length'),
-                total_chars_shared=Sum('code_length')
+        # Summary totals in one pass; Avg/Sum skip rows without a code_length
+        def totals_query():
+            return (
+                VSCodeTelemetryEvent.objects
+                .filter(timestamp__gte=day_start(start_date))
+                .aggregate(
+                    total_clients=count_distinct('client_id'),
+                    total_events=Count('id'),
+                    errors=Count('id', filter=Q(event_name='shareError')),
+                    avg_length=Avg('code_length'),
+                    total_chars_shared=Sum('code_length')
+                )
             )
+        
+        results = fetch_concurrently(
+            daily_activity=daily_activity,
+            event_distribution=event_distribution,
+            version_distribution=version_distribution,
+            language_usage=language_usage,
+            error_analysis=error_analysis,
+            totals=totals_query,
         )
+        totals = results['totals']
         
-        return Response({
+        return {
             'period': period,
-            'daily_activity': daily_activity,
-            'event_distribution': event_distribution,
-            'version_distribution': version_distribution,
-            'language_usage': language_usage,
-            'error_analysis': error_analysis,
+            'daily_activity': results['daily_activity'],
+            'event_distribution': results['event_distribution'],
+            'version_distribution': results['version_distribution'],
+            'language_usage': results['language_usage'],
+            'error_analysis': results['error_analysis'],
             'summary': {
-                'total_active_clients': total_clients,
-                'total_events': sum(item['total_events'] for item in daily_activity),
-                'avg_code_length': round(code_stats['avg_length'] or 0, 2),
-                'total_characters_shared': code_stats['total_chars_shared'] or 0,
+                'total_active_clients': totals['total_clients'],
+                'total_events': totals['total_events'],
+                'avg_code_length': round(totals['avg_length'] or 0, 2),
+                'total_characters_shared': totals['total_chars_shared'] or 0,
                 'error_rate': round(
-                    (sum(item['errors'] for item in daily_activity) / 
-                     sum(item['total_events'] for item in daily_activity) * 100), 2
-                ) if sum(item['total_events'] for item in daily_activity) > 0 else 0
+                    totals['errors'] / totals['total_events'] * 100, 2
+                ) if totals['total_events'] > 0 else 0
             }
-        })
+        }
     
     def _get_date_range_and_trunc(self, period):
         """Helper method to get date range and truncation function"""
@@ -460,10 +561,8 @@ class VSCodeAnalyticsView(APIView):
             trunc_func = TruncWeek
         elif period == 'all':
             # For all time, get the earliest event date
-            earliest_event = VSCodeTelemetryEvent.objects.order_by('timestamp').first()
-            if earliest_event:
-                start_date = earliest_event.timestamp.date()
-            else:
+            start_date = earliest_date(VSCodeTelemetryEvent, 'timestamp')
+            if start_date is None:
                 start_date = end_date - timedelta(days=365)
             trunc_func = TruncMonth  # Use monthly grouping for all-time data
         else:
@@ -477,52 +576,82 @@ class PerformanceAnalyticsView(APIView):
     """
     System performance and optimization analytics
     """
+    @method_decorator(cache_page(ANALYTICS_CACHE_TIMEOUT))
+    @method_decorator(vary_on_headers('Authorization'))
     def get(self, request):
         period = request.query_params.get('period', '30d')
-        
+        return Response(self._build_payload(period))
+
+    def _build_payload(self, period):
         # FIXED: Use the helper method consistently
         start_date = self._get_start_date(period)
         
-        # Snippet lifecycle metrics
-        snippet_lifecycle = (
-            Snippet.objects
-            .filter(created_at__date__gte=start_date)
-            .aggregate(
-                avg_views_before_expiry=Avg('view_count'),
-                never_viewed=Count('id', filter=Q(view_count=0)),
-                highly_viewed=Count('id', filter=Q(view_count__gte=10)),
-            )
-        )
-        
-        # Calculate average time to first view separately to avoid complex joins
-        first_views = (
-            SnippetView.objects
-            .filter(
-                snippet__created_at__date__gte=start_date,
-                viewed_at__isnull=False
-            )
-            .annotate(
-                time_to_view=F('viewed_at') - F('snippet__created_at')
-            )
-            .aggregate(
-                avg_time_to_first_view=Avg('time_to_view')
-            )
-        )
-        
-        # Add the time calculation to snippet_lifecycle
-        snippet_lifecycle.update(first_views)
+        now = timezone.now()
         
-        # Storage and content analysis using proper Length function
-        content_analysis = (
-            Snippet.objects
-            .filter(created_at__date__gte=start_date)
-            .aggregate(
-                avg_content_length=Avg(Length('content')),
-                total_content_size=Sum(Length('content')),
-                total_snippets=Count('id'),
-                encrypted_count=Count('id', filter=Q(is_encrypted=True))
-            )
+        results = fetch_concurrently(
+            # Lifecycle, content and version counters share one pass over Snippet
+            snippet_stats=lambda: (
+                Snippet.objects
+                .filter(created_at__gte=day_start(start_date))
+                .aggregate(
+                    avg_views_before_expiry=Avg('view_count'),
+                    never_viewed=Count('id', filter=Q(view_count=0)),
+                    highly_viewed=Count('id', filter=Q(view_count__gte=10)),
+                    avg_content_length=Avg('content_length'),
+                    total_content_size=Sum('content_length'),
+                    total_snippets=Count('id'),
+                    encrypted_count=Count('id', filter=Q(is_encrypted=True)),
+                    total_versions=Count('id', filter=Q(parent_snippet__isnull=False)),
+                    # Avg skips snippets that were never viewed
+                    avg_time_to_first_view=Avg(F('first_viewed_at') - F('created_at')),
+                )
+            ),
+            # Parent snippets and the average number of versions they carry
+            parent_snippets_with_versions=lambda: (
+                Snippet.objects
+                .filter(created_at__gte=day_start(start_date))
+                .exclude(parent_snippet__isnull=True)
+                .values('parent_snippet')
+                .annotate(version_count=Count('id'))
+                .aggregate(avg_versions=Avg('version_count'))
+            ),
+            # Most active times (peak usage)
+            peak_hours=(
+                SnippetView.objects
+                .filter(viewed_at__gte=day_start(start_date))
+                .annotate(hour=ExtractHour('viewed_at'))
+                .values('hour')
+                .annotate(views=Count('id'))
+                .order_by('-views')[:5]
+            ),
+            # Diff generation usage
+            diff_usage=SnippetDiff.objects.filter(
+                created_at__gte=day_start(start_date)
+            ).count,
+            # Expiration patterns
+            expiration_analysis=lambda: (
+                Snippet.objects
+                .filter(created_at__gte=day_start(start_date))
+                .annotate(
+                    lifetime_seconds=Extract(
+                        F('expires_at') - F('created_at'), 'epoch'
+                    )
+                )
+                .aggregate(
+                    avg_lifetime_seconds=Avg('lifetime_seconds'),
+                    expired_before_view=Count('id', filter=Q(
+                        expires_at__lt=now,
+                        view_count=0
+                    ))
+                )
+            ),
         )
+        snippet_stats = results['snippet_stats']
+        snippet_lifecycle = snippet_stats
+        content_analysis = snippet_stats
+        peak_hours = results['peak_hours']
+        diff_usage = results['diff_usage']
+        expiration_analysis = results['expiration_analysis']
         
         # Calculate encryption ratio safely
         total_snippets = content_analysis['total_snippets'] or 1
@@ -530,66 +659,17 @@ class PerformanceAnalyticsView(APIView):
             content_analysis['encrypted_count'] * 100.0 / total_snippets
         )
         
-        # Version usage analysis - Calculate separately to avoid field lookup errors
-        total_versions = Snippet.objects.filter(
-            created_at__date__gte=start_date,
-            parent_snippet__isnull=False
-        ).count()
-        
-        # Get parent snippets and count their versions
-        parent_snippets_with_versions = (
-            Snippet.objects
-            .filter(created_at__date__gte=start_date)
-            .exclude(parent_snippet__isnull=True)
-            .values('parent_snippet')
-            .annotate(version_count=Count('id'))
-            .aggregate(avg_versions=Avg('version_count'))
-        )
-        
         version_analysis = {
-            'total_versions': total_versions,
-            'avg_versions_per_parent': parent_snippets_with_versions['avg_versions'] or 0
+            'total_versions': snippet_stats['total_versions'],
+            'avg_versions_per_parent': results['parent_snippets_with_versions']['avg_versions'] or 0
         }
         
-        # Most active times (peak usage)
-        peak_hours = list(
-            SnippetView.objects
-            .filter(viewed_at__date__gte=start_date)
-            .extra(select={'hour': 'EXTRACT(hour FROM viewed_at)'})
-            .values('hour')
-            .annotate(views=Count('id'))
-            .order_by('-views')[:5]
-        )
-        
-        # Diff generation usage
-        diff_usage = SnippetDiff.objects.filter(
-            created_at__date__gte=start_date
-        ).count()
-        
-        # Expiration patterns using proper Extract import
-        expiration_analysis = (
-            Snippet.objects
-            .filter(created_at__date__gte=start_date)
-            .annotate(
-                lifetime_seconds=Extract(
-                    F('expires_at') - F('created_at'), 'epoch'
-                )
-            )
-            .aggregate(
-                avg_lifetime_seconds=Avg('lifetime_seconds'),
-                expired_before_view=Count('id', filter=Q(
-                    expires_at__lt=timezone.now(),
-                    view_count=0
-                ))
-            )
-        )
-        
         # Convert seconds to hours safely
         avg_lifetime_hours = 0
         if expiration_analysis['avg_lifetime_seconds']:
             avg_lifetime_hours = expiration_analysis['avg_lifetime_seconds'] / 3600.0
         
-        return Response({
+        return {
             'period': period,
             'snippet_lifecycle': {
                 'avg_views_before_expiry': round(snippet_lifecycle['avg_views_before_expiry'] or 0, 2),
@@ -614,7 +694,7 @@ class PerformanceAnalyticsView(APIView):
                 'avg_snippet_lifetime_hours': round(avg_lifetime_hours, 2),
                 'expired_before_view': expiration_analysis['expired_before_view'] or 0
             }
-        })
+        }
 
     def _get_start_date(self, period):
         """Helper method to get start date"""
@@ -628,11 +708,7 @@ class PerformanceAnalyticsView(APIView):
             return end_date - timedelta(days=90)
         elif period == 'all':
             # For all time, get the earliest snippet date
-            earliest_snippet = Snippet.objects.order_by('created_at').first()
-            if earliest_snippet:
-                return earliest_snippet.created_at.date()
-            else:
-                return end_date - timedelta(days=365)
+            return earliest_date(Snippet, 'created_at') or end_date - timedelta(days=365)
         else:
             return end_date - timedelta(days=30)
 
@@ -641,23 +717,46 @@ class RealTimeMetricsView(APIView):
     """
     Real-time metrics for live dashboard updates
     """
+    @method_decorator(cache_page(10))
+    @method_decorator(vary_on_headers('Authorization'))
     def get(self, request):
         now = timezone.now()
         last_hour = now - timedelta(hours=1)
         last_24h = now - timedelta(hours=24)
         
-        # Last hour activity
-        recent_activity = {
-            'snippets_created_last_hour': Snippet.objects.filter(
-                created_at__gte=last_hour
-            ).count(),
-            'views_last_hour': SnippetView.objects.filter(
-                viewed_at__gte=last_hour
-            ).count(),
-            'vscode_events_last_hour': VSCodeTelemetryEvent.objects.filter(
+        # Last hour activity from the per-minute Redis counters, falling back
+        # to the database until they cover a full hour
+        counters = realtime.last_hour(('snippets', 'views', 'vscode', 'vscode_errors'), now)
+        if counters is not None:
+            recent_activity = {
+                'snippets_created_last_hour': counters['snippets'],
+                'views_last_hour': counters['views'],
+                'vscode_events_last_hour': counters['vscode'],
+            }
+            active_users = counters['unique_ips']
+            total_events = counters['vscode']
+            error_events = counters['vscode_errors']
+        else:
+            vscode_events_last_hour = VSCodeTelemetryEvent.objects.filter(
                 timestamp__gte=last_hour
-            ).count(),
-        }
+            )
+            total_events = vscode_events_last_hour.count()
+            error_events = vscode_events_last_hour.filter(event_name='shareError').count()
+            recent_activity = {
+                'snippets_created_last_hour': Snippet.objects.filter(
+                    created_at__gte=last_hour
+                ).count(),
+                'views_last_hour': SnippetView.objects.filter(
+                    viewed_at__gte=last_hour
+                ).count(),
+                'vscode_events_last_hour': total_events,
+            }
+            # Active users approximation (unique IPs in last hour)
+            active_users = (
+                SnippetView.objects
+                .filter(viewed_at__gte=last_hour)
+                .aggregate(count=count_distinct('ip_hash'))['count']
+            )
         
         # Real-time language trends (last 24h)
         trending_languages = list(
@@ -668,15 +767,6 @@ class RealTimeMetricsView(APIView):
             .order_by('-count')[:5]
         )
         
-        # Active users approximation (unique IPs in last hour)
-        active_users = (
-            SnippetView.objects
-            .filter(viewed_at__gte=last_hour)
-            .values('ip_hash')
-            .distinct()
-            .count()
-        )
-        
         # System health indicators
         health_metrics = {
             'total_active_snippets': Snippet.objects.filter(
@@ -686,18 +776,11 @@ class RealTimeMetricsView(APIView):
             'avg_response_time': 'N/A',  # Would require request logging
         }
         
-        # Calculate error rate
-        vscode_events_last_hour = VSCodeTelemetryEvent.objects.filter(
-            timestamp__gte=last_hour
-        )
-        total_events = vscode_events_last_hour.count()
-        error_events = vscode_events_last_hour.filter(event_name='shareError').count()
-        
         if total_events > 0:
             health_metrics['error_rate_last_hour'] = round((error_events / total_events) * 100, 2)
         
         return Response({
-            'timestamp': now.isoformat(),
+            'timestamp': now,
             'recent_activity': recent_activity,
             'trending_languages': trending_languages,
             'active_users_estimate': active_users,
@@ -731,7 +814,7 @@ class CustomAnalyticsView(APIView):
         
         language_performance = list(
             Snippet.objects
-            .filter(created_at__date__gte=start_date)
+            .filter(created_at__gte=day_start(start_date))
             .values('language')
             .annotate(
                 total_snippets=Count('id'),
@@ -754,87 +837,106 @@ class CustomAnalyticsView(APIView):
         period_days = filters.get('period_days', 30)
         start_date = timezone.now().date() - timedelta(days=period_days)
         
-        # Analyze user return patterns based on IP hashes
+        # Per-visitor totals come from VisitorStats, maintained on every view.
+        # Figures are lifetime totals for visitors active within the window.
         user_patterns = (
-            SnippetView.objects
-            .filter(viewed_at__date__gte=start_date)
-            .values('ip_hash')
-            .annotate(
-                total_views=Count('id'),
-                first_visit=Min('viewed_at'),
-                last_visit=Max('viewed_at'),
-                unique_snippets=Count('snippet', distinct=True)
-            )
+            VisitorStats.objects
+            .filter(last_visit__gte=day_start(start_date))
             .annotate(
-                visit_span_days=Case(
-                    When(
-                        first_visit=F('last_visit'),
-                        then=Value(0)
-                    ),
-                    default=(F('last_visit') - F('first_visit')) / timedelta(days=1),
+                visit_span_days=ExpressionWrapper(
+                    Extract(F('last_visit') - F('first_visit'), 'epoch') / 86400.0,
                     output_field=models.FloatField()
                 )
             )
         )
         
-        # Aggregate retention metrics
-        retention_summary = user_patterns.aggregate(
+        # Retention metrics and user segments in a single pass
+        metrics = user_patterns.aggregate(
             total_users=Count('ip_hash'),
             avg_views_per_user=Avg('total_views'),
             avg_visit_span=Avg('visit_span_days'),
-            returning_users=Count('ip_hash', filter=Q(total_views__gt=1))
+            returning_users=Count('ip_hash', filter=Q(total_views__gt=1)),
+            one_time_users=Count('ip_hash', filter=Q(total_views=1)),
+            casual_users=Count('ip_hash', filter=Q(total_views__range=[2, 5])),
+            regular_users=Count('ip_hash', filter=Q(total_views__range=[6, 15])),
+            power_users=Count('ip_hash', filter=Q(total_views__gt=15))
         )
+        segment_keys = ('one_time_users', 'casual_users', 'regular_users', 'power_users')
         
         return Response({
             'query_type': 'user_retention',
             'period_days': period_days,
-            'summary': retention_summary,
-            'user_segments': {
-                'one_time_users': user_patterns.filter(total_views=1).count(),
-                'casual_users': user_patterns.filter(total_views__range=[2, 5]).count(),
-                'regular_users': user_patterns.filter(total_views__range=[6, 15]).count(),
-                'power_users': user_patterns.filter(total_views__gt=15).count
-            }
+            'summary': {k: v for k, v in metrics.items() if k not in segment_keys},
+            'user_segments': {k: metrics[k] for k in segment_keys}
         })
     
     def _content_analysis(self, filters):
         period_days = filters.get('period_days', 30)
-        start_date = timezone.now().date() - timedelta(days=period_days)
-        
-        content_metrics = (
-            Snippet.objects
-            .filter(created_at__date__gte=start_date)
-            .annotate(
-                content_length=Length('content'),
-                lines_count=Value(1)  # Would need custom function to count lines
-            )
-            .aggregate(
-                total_snippets=Count('id'),
-                avg_length=Avg('content_length'),
-                min_length=Min('content_length'),
-                max_length=Max('content_length'),
-                total_characters=Sum('content_length'),
-                encrypted_ratio=Count('id', filter=Q(is_encrypted=True)) * 100.0 / Count('id')
-            )
+        key = f"{CONTENT_ANALYSIS_CACHE_PREFIX}:{period_days}:{timezone.now().date().isoformat()}"
+        payload = cache.get_or_set(
+            key, lambda: self._content_analysis_payload(period_days), CONTENT_ANALYSIS_CACHE_TIMEOUT
         )
+        return Response(payload)
+    
+    def _content_analysis_payload(self, period_days):
+        start_date = timezone.now().date() - timedelta(days=period_days)
         
-        # Length distribution buckets
-        length_buckets = (
-            Snippet.objects
-            .filter(created_at__date__gte=start_date)
-            .annotate(content_length=Length('content'))
+        # Summed from the per-day rollup rather than rescanning the window
+        totals = (
+            SnippetDailyMetrics.objects
+            .filter(date__gte=start_date)
             .aggregate(
-                very_short=Count('id', filter=Q(content_length__lt=100)),
-                short=Count('id', filter=Q(content_length__range=[100, 500])),
-                medium=Count('id', filter=Q(content_length__range=[501, 2000])),
-                long=Count('id', filter=Q(content_length__range=[2001, 10000])),
-                very_long=Count('id', filter=Q(content_length__gt=10000))
+                total_snippets=Sum('created'),
+                total_characters=Sum('length_total'),
+                min_length=Min('length_min'),
+                max_length=Max('length_max'),
+                encrypted=Sum('encrypted'),
+                very_short=Sum('very_short'),
+                short=Sum('short'),
+                medium=Sum('medium'),
+                long=Sum('long'),
+                very_long=Sum('very_long')
             )
         )
+        total_snippets = totals['total_snippets'] or 0
+        content_metrics = {
+            'total_snippets': total_snippets,
+            'avg_length': totals['total_characters'] / total_snippets if total_snippets else None,
+            'min_length': totals['min_length'],
+            'max_length': totals['max_length'],
+            'total_characters': totals['total_characters'],
+            'encrypted_ratio': totals['encrypted'] * 100.0 / total_snippets if total_snippets else None,
+        }
+        length_buckets = {
+            k: totals[k] or 0
+            for k in ('very_short', 'short', 'medium', 'long', 'very_long')
+        }
         
-        return Response({
+        return {
             'query_type': 'content_analysis',
             'period_days': period_days,
             'content_metrics': content_metrics,
             'length_distribution': length_buckets
-        })
\ No newline at end of file
+        }
+
+
+# Section name -> view callable, built once at import so a request resolves
+# through a single URL pattern and a dict lookup.
+ANALYTICS_SECTIONS = {
+    'dashboard': AnalyticsDashboardView.as_view(),
+    'snippets': SnippetAnalyticsView.as_view(),
+    'users': UserBehaviorAnalyticsView.as_view(),
+    'vscode': VSCodeAnalyticsView.as_view(),
+    'performance': PerformanceAnalyticsView.as_view(),
+    'realtime': RealTimeMetricsView.as_view(),
+    'custom': CustomAnalyticsView.as_view(),
+}
+
+
+@csrf_exempt
+def analytics_router(request, section):
+    """Dispatch /analytics/<section>/ to the matching analytics view"""
+    view = ANALYTICS_SECTIONS.get(section)
+    if view is None:
+        raise Http404(f"Unknown analytics section: {section}")
+    return view(request)
@@ -2,11 +2,9 @@ from __future__ import absolute_import, unicode_literals
 
 import os
 
-import django
 from celery import Celery
 
-os.environ["DJANGO_SETTINGS_MODULE"] = "codely.settings"
-django.setup()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "codely.settings")
 
 
 app = Celery("get_link")
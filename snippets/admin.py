@@ -1,5 +1,16 @@
+import string
+import uuid
+from functools import lru_cache
+
+import orjson
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import BooleanField, Case, DurationField, ExpressionWrapper, F, FloatField, Q, Value, When
+from django.db.models.functions import Now, Substr
 from django.urls import reverse
+from django.utils.functional import cached_property
+from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 from django.utils.timezone import now
 from .models import (
@@ -14,6 +25,43 @@ from .models import (
     SecretScanLog,
 )
 
+@lru_cache(maxsize=1)
+def _snippet_change_template():
+    # Resolved once; the per-row links only substitute the primary key
+    return reverse('admin:snippets_snippet_change', args=['__pk__'])
+
+def snippet_change_url(pk):
+    return _snippet_change_template().replace('__pk__', str(pk))
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Uses the planner's pg_class row estimate for unfiltered changelists on
+    large tables instead of a full COUNT(*).
+    """
+    # Below this the estimate is too coarse and COUNT(*) is cheap anyway
+    estimate_threshold = 10000
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                    [self.object_list.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+            if row and row[0] >= self.estimate_threshold:
+                return row[0]
+        return super().count
+
+class SnippetLinkMixin:
+    """Shared link column for admins of models with a ``snippet`` foreign key"""
+    def snippet_link(self, obj):
+        url = snippet_change_url(obj.snippet_id)
+        return mark_safe('<a href="{}">{}</a>'.format(url, obj.snippet_id))
+    snippet_link.short_description = 'Snippet'
+
 class SnippetViewInline(admin.TabularInline):
     model = SnippetView
     extra = 0
@@ -35,15 +83,21 @@ class VersionInline(admin.TabularInline):
         return False
         
     def version_link(self, obj):
-        url = reverse('admin:snippets_snippet_change', args=[obj.id])
+        url = snippet_change_url(obj.id)
         return mark_safe('<a href="{}">View Version</a>'.format(url))
     version_link.short_description = 'View'
     
+    def get_queryset(self, request):
+        # One character past the preview is enough to know it was truncated
+        return super().get_queryset(request).annotate(
+            preview=Substr('content', 1, 201)
+        ).defer('content')
+    
     def content_preview(self, obj):
         if obj.is_encrypted:
             return "[Encrypted Content]"
-        preview = obj.content[:200] + "..." if len(obj.content) > 200 else obj.content
-        return mark_safe('<pre>{}</pre>'.format(preview))
+        preview = obj.preview[:200] + "..." if len(obj.preview) > 200 else obj.preview
+        return format_html('<pre>{}</pre>', preview)
     content_preview.short_description = 'Content Preview'
 
 class SnippetDiffInline(admin.TabularInline):
@@ -64,19 +118,26 @@ class SnippetDiffInline(admin.TabularInline):
         return "-"
     diff_preview.short_description = 'Diff Preview'
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('target_snippet')
+    
     def target_link(self, obj):
-        url = reverse('admin:snippets_snippet_change', args=[obj.target_snippet.id])
+        url = snippet_change_url(obj.target_snippet_id)
         return mark_safe('<a href="{}">View Target</a>'.format(url))
     target_link.short_description = 'Target'
 
 @admin.register(Snippet)
 class SnippetAdmin(admin.ModelAdmin):
-    list_display = ('id', 'language', 'created_at', 'expires_at', 'view_count', 
+    list_display = ('id', 'language', 'created_at', 'expires_at', 'is_expired', 'view_count', 
                     'is_encrypted', 'one_time_view', 'has_password', 'version',
                     'is_public', 'public_name', 'max_views', 'allow_comments', 'parent_link')
     list_filter = ('language', 'is_encrypted', 'one_time_view', 'is_public', 'created_at', 'version', 'allow_comments')
-    search_fields = ('id', 'content', 'language', 'creator_ip_hash', 'public_name')
+    # icontains on these is served by the trigram indexes on UPPER(column);
+    # ids and creator hashes are matched exactly in get_search_results
+    search_fields = ('content', '=language', 'public_name')
     ordering = ('-created_at',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     readonly_fields = ('id', 'access_token', 'created_at', 'view_count', 'parent_snippet', 'version',
                       'content_preview', 'expires_in', 'sharing_url', 'creator_ip_hash',
                       'creator_location', 'protection_level', 'remaining_views_display')
@@ -107,11 +168,57 @@ class SnippetAdmin(admin.ModelAdmin):
     )
     inlines = [VersionInline, SnippetDiffInline, SnippetViewInline]
     
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        match = request.resolver_match
+        if match and match.url_name.endswith('_changelist'):
+            # Only the columns list_display renders; the flags and parent
+            # link come from annotations and parent_snippet_id
+            qs = qs.only(
+                'id', 'language', 'created_at', 'expires_at', 'view_count',
+                'is_encrypted', 'one_time_view', 'version', 'is_public',
+                'public_name', 'max_views', 'allow_comments', 'parent_snippet',
+            )
+        else:
+            # The change view's readonly parent_snippet field would otherwise
+            # fetch the parent separately
+            qs = qs.select_related('parent_snippet')
+        return qs.annotate(
+            has_password_flag=ExpressionWrapper(
+                Q(password_hash__isnull=False) & Q(password_salt__isnull=False),
+                output_field=BooleanField()
+            ),
+            is_expired_flag=ExpressionWrapper(
+                Q(expires_at__isnull=False) & Q(expires_at__lte=Now()),
+                output_field=BooleanField()
+            ),
+            time_left=ExpressionWrapper(
+                F('expires_at') - Now(), output_field=DurationField()
+            ),
+        )
+    
+    def get_search_results(self, request, queryset, search_term):
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        term = search_term.strip()
+        try:
+            results |= queryset.filter(pk=uuid.UUID(term))
+        except ValueError:
+            if len(term) == 64 and all(c in string.hexdigits for c in term):
+                results |= queryset.filter(creator_ip_hash=term.lower())
+        return results, may_have_duplicates
+    
     def has_password(self, obj):
-        return bool(obj.password_hash and obj.password_salt)
+        return obj.has_password_flag
     has_password.boolean = True
+    has_password.admin_order_field = 'has_password_flag'
     has_password.short_description = 'Password Protected'
     
+    def is_expired(self, obj):
+        return obj.is_expired_flag
+    is_expired.boolean = True
+    is_expired.admin_order_field = 'is_expired_flag'
+    is_expired.short_description = 'Expired'
+    
     def content_preview(self, obj):
         if obj.is_encrypted:
             return "[Encrypted Content]"
@@ -120,9 +227,14 @@ class SnippetAdmin(admin.ModelAdmin):
     content_preview.short_description = 'Content Preview'
     
     def expires_in(self, obj):
-        if obj.expires_at <= now():
+        # time_left is annotated in get_queryset; unsaved objects lack it
+        delta = getattr(obj, 'time_left', None)
+        if delta is None:
+            if obj.expires_at is None:
+                return "-"
+            delta = obj.expires_at - now()
+        if delta.total_seconds() <= 0:
             return "Expired"
-        delta = obj.expires_at - now()
         days = delta.days
         hours, remainder = divmod(delta.seconds, 3600)
         minutes, seconds = divmod(remainder, 60)
@@ -149,8 +261,8 @@ class SnippetAdmin(admin.ModelAdmin):
     remaining_views_display.short_description = 'Remaining Views'
     
     def parent_link(self, obj):
-        if obj.parent_snippet:
-            url = reverse('admin:snippets_snippet_change', args=[obj.parent_snippet.id])
+        if obj.parent_snippet_id:
+            url = snippet_change_url(obj.parent_snippet_id)
             return mark_safe('<a href="{}">View Parent</a>'.format(url))
         return "-"
     parent_link.short_description = 'Parent'
@@ -162,19 +274,16 @@ class SnippetAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
 @admin.register(SnippetView)
-class SnippetViewAdmin(admin.ModelAdmin):
+class SnippetViewAdmin(SnippetLinkMixin, admin.ModelAdmin):
     list_display = ('id', 'snippet_link', 'viewed_at', 'ip_hash', 'user_agent', 'location')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     list_filter = ('viewed_at',)
     search_fields = ('ip_hash', 'user_agent', 'location')
     readonly_fields = ('id', 'snippet', 'viewed_at', 'ip_hash', 'user_agent', 'location')
     
     def has_add_permission(self, request):
         return False
-    
-    def snippet_link(self, obj):
-        url = reverse('admin:snippets_snippet_change', args=[obj.snippet.id])
-        return mark_safe('<a href="{}">{}</a>'.format(url, obj.snippet.id))
-    snippet_link.short_description = 'Snippet'
 
 @admin.register(SnippetMetrics)
 class SnippetMetricsAdmin(admin.ModelAdmin):
@@ -202,13 +311,13 @@ class SnippetDiffAdmin(admin.ModelAdmin):
         return False
     
     def source_snippet_link(self, obj):
-        url = reverse('admin:snippets_snippet_change', args=[obj.source_snippet.id])
-        return mark_safe('<a href="{}">{}</a>'.format(url, obj.source_snippet.id))
+        url = snippet_change_url(obj.source_snippet_id)
+        return mark_safe('<a href="{}">{}</a>'.format(url, obj.source_snippet_id))
     source_snippet_link.short_description = 'Source Snippet'
     
     def target_snippet_link(self, obj):
-        url = reverse('admin:snippets_snippet_change', args=[obj.target_snippet.id])
-        return mark_safe('<a href="{}">{}</a>'.format(url, obj.target_snippet.id))
+        url = snippet_change_url(obj.target_snippet_id)
+        return mark_safe('<a href="{}">{}</a>'.format(url, obj.target_snippet_id))
     target_snippet_link.short_description = 'Target Snippet'
 
 
@@ -216,6 +325,8 @@ class SnippetDiffAdmin(admin.ModelAdmin):
 @admin.register(VSCodeTelemetryEvent)
 class VSCodeTelemetryEventAdmin(admin.ModelAdmin):
     list_display = ('event_name', 'client_id', 'timestamp', 'language', 'code_length', 'vs_code_version', 'has_error')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     list_filter = ('event_name', 'vs_code_version', 'timestamp', 'language')
     search_fields = ('client_id', 'error_message')
     date_hierarchy = 'timestamp'
@@ -223,9 +334,18 @@ class VSCodeTelemetryEventAdmin(admin.ModelAdmin):
                       'vs_code_version', 'language', 'code_length', 'error_message', 
                       'request_data_pretty')
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            has_error_flag=ExpressionWrapper(
+                Q(error_message__isnull=False) & ~Q(error_message=''),
+                output_field=BooleanField()
+            )
+        )
+    
     def has_error(self, obj):
-        return bool(obj.error_message)
+        return obj.has_error_flag
     has_error.boolean = True
+    has_error.admin_order_field = 'has_error_flag'
     has_error.short_description = 'Error'
     
     def request_data_pretty(self, obj):
@@ -234,9 +354,9 @@ class VSCodeTelemetryEventAdmin(admin.ModelAdmin):
             return None
             
         try:
-            import json
-            formatted_json = json.dumps(obj.request_data, indent=2)
-            return mark_safe(f'<pre>{formatted_json}</pre>')
+            formatted_json = orjson.dumps(obj.request_data, option=orjson.OPT_INDENT_2).decode()
+            # format_html escapes the payload, which is client supplied
+            return format_html('<pre>{}</pre>', formatted_json)
         except Exception:
             return str(obj.request_data)
     request_data_pretty.short_description = 'Request Data'
@@ -252,12 +372,19 @@ class VSCodeExtensionMetricsAdmin(admin.ModelAdmin):
     readonly_fields = ('date', 'total_actions', 'selection_shares', 'file_shares',
                       'unique_clients', 'error_count', 'error_rate', 'detail_link')
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            error_rate_value=Case(
+                When(total_actions=0, then=Value(0.0)),
+                default=F('error_count') * 100.0 / F('total_actions'),
+                output_field=FloatField()
+            )
+        )
+    
     def error_rate(self, obj):
-        """Calculate error rate as percentage"""
-        if not obj.total_actions:
-            return "0%"
-        rate = (obj.error_count / obj.total_actions) * 100
-        return f"{rate:.2f}%"
+        """Error rate as a percentage, computed in get_queryset"""
+        return f"{obj.error_rate_value:.2f}%"
+    error_rate.admin_order_field = 'error_rate_value'
     error_rate.short_description = 'Error Rate'
     
     def detail_link(self, obj):
@@ -272,7 +399,7 @@ class VSCodeExtensionMetricsAdmin(admin.ModelAdmin):
 
 
 @admin.register(SnippetComment)
-class SnippetCommentAdmin(admin.ModelAdmin):
+class SnippetCommentAdmin(SnippetLinkMixin, admin.ModelAdmin):
     list_display = ('id', 'snippet_link', 'display_name', 'created_at', 'ip_hash')
     search_fields = ('content', 'display_name', 'ip_hash')
     list_filter = ('created_at',)
@@ -282,14 +409,9 @@ class SnippetCommentAdmin(admin.ModelAdmin):
     def has_add_permission(self, request):
         return False
 
-    def snippet_link(self, obj):
-        url = reverse('admin:snippets_snippet_change', args=[obj.snippet.id])
-        return mark_safe('<a href="{}">{}</a>'.format(url, obj.snippet.id))
-    snippet_link.short_description = 'Snippet'
-
 
 @admin.register(SnippetReaction)
-class SnippetReactionAdmin(admin.ModelAdmin):
+class SnippetReactionAdmin(SnippetLinkMixin, admin.ModelAdmin):
     list_display = ('id', 'snippet_link', 'reaction_type', 'count', 'updated_at')
     list_filter = ('reaction_type', 'updated_at')
     search_fields = ('snippet__id', 'reaction_type')
@@ -299,14 +421,9 @@ class SnippetReactionAdmin(admin.ModelAdmin):
     def has_add_permission(self, request):
         return False
 
-    def snippet_link(self, obj):
-        url = reverse('admin:snippets_snippet_change', args=[obj.snippet.id])
-        return mark_safe('<a href="{}">{}</a>'.format(url, obj.snippet.id))
-    snippet_link.short_description = 'Snippet'
-
 
 @admin.register(SecretScanLog)
-class SecretScanLogAdmin(admin.ModelAdmin):
+class SecretScanLogAdmin(SnippetLinkMixin, admin.ModelAdmin):
     list_display = ('id', 'snippet_link', 'rule_type', 'severity', 'created_at')
     list_filter = ('rule_type', 'severity', 'created_at')
     search_fields = ('rule_type', 'severity', 'matched_fragment')
@@ -316,7 +433,3 @@ class SecretScanLogAdmin(admin.ModelAdmin):
     def has_add_permission(self, request):
         return False
 
-    def snippet_link(self, obj):
-        url = reverse('admin:snippets_snippet_change', args=[obj.snippet.id])
-        return mark_safe('<a href="{}">{}</a>'.format(url, obj.snippet.id))
-    snippet_link.short_description = 'Snippet'
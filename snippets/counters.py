@@ -0,0 +1,63 @@
+# snippets/counters.py
+"""
+Daily metric counters buffered in the cache and periodically flushed to the
+database by ``snippets.tasks``.
+
+Increments go through ``cache.incr`` so concurrent requests never overwrite
+each other, and flushing subtracts only what was written out so increments
+that land mid-flush carry over to the next one. Flushes cover yesterday as
+well as today, so counters outlive their day. Distinct members are kept in
+native Redis sets so adding one never moves the whole set over the wire.
+"""
+from django.core.cache import cache
+from django_redis import get_redis_connection
+
+# Keys are per day; keep them until the day after has flushed them too
+COUNTER_TTL = 2 * 24 * 60 * 60
+# Sets hold a whole day's members and are never drained, only expired
+MEMBER_TTL = 2 * 24 * 60 * 60
+
+
+def incr(key):
+    """
+    Atomically add one to ``key``, creating it on first use, and return the new
+    value. Returns None if the cache is unreachable so callers can fall back to
+    the database.
+    """
+    try:
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # Missing key; if another request creates it first, incr that instead
+            if cache.add(key, 1, COUNTER_TTL):
+                return 1
+            return cache.incr(key)
+    except Exception:
+        return None
+
+
+def peek(key):
+    return cache.get(key, 0)
+
+
+def drain(key, count):
+    """Remove ``count`` flushed increments from ``key``"""
+    if count:
+        try:
+            cache.decr(key, count)
+        except ValueError:
+            pass
+
+
+def add_member(key, member):
+    """Add ``member`` to the set at ``key`` and return the set's size"""
+    conn = get_redis_connection('default')
+    pipe = conn.pipeline()
+    pipe.sadd(key, member)
+    pipe.expire(key, MEMBER_TTL)
+    pipe.scard(key)
+    return pipe.execute()[-1]
+
+
+def count_members(key):
+    return get_redis_connection('default').scard(key)
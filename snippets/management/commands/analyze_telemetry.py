@@ -3,10 +3,10 @@
 import csv
 import json
 from datetime import datetime, timedelta
-from collections import Counter, defaultdict
 from django.core.management.base import BaseCommand
 from django.utils import timezone
-from django.db.models import Count, Avg, Max, Min, Q
+from django.db.models import Count, Avg, Max, Min, Q, CharField, Func, Value
+from django.db.models.functions import Coalesce, NullIf
 from snippets.models import VSCodeTelemetryEvent, VSCodeExtensionMetrics
 
 
@@ -61,56 +61,72 @@ class Command(BaseCommand):
         if errors_only:
             queryset = queryset.filter(event_name='shareError')
         
-        # Get total event count
-        total_events = queryset.count()
+        # Total events and unique clients in one pass
+        totals = queryset.aggregate(
+            total=Count('id'),
+            unique_users=Count('client_id', distinct=True),
+            avg_length=Avg('code_length'),
+            min_length=Min('code_length'),
+            max_length=Max('code_length')
+        )
+        total_events = totals['total']
         self.stdout.write(f"Total events: {total_events}")
+        if totals['avg_length'] is not None:
+            self.stdout.write(
+                f"Code length: avg {totals['avg_length']:.0f}, "
+                f"min {totals['min_length']}, max {totals['max_length']}"
+            )
         
         # Analyze event types
+        # Percentages are derived from total_events here rather than in SQL
         event_types = queryset.values('event_name').annotate(
-            count=Count('id'),
-            percentage=Count('id') * 100.0 / total_events
+            count=Count('id')
         ).order_by('-count')
         
         self.stdout.write("\nEvent Types:")
         for et in event_types:
-            self.stdout.write(f"  {et['event_name']}: {et['count']} ({et['percentage']:.1f}%)")
+            self.stdout.write(f"  {et['event_name']}: {et['count']} ({et['count'] * 100.0 / total_events:.1f}%)")
         
         # Language distribution
         languages = queryset.exclude(language='').values('language').annotate(
-            count=Count('id'),
-            percentage=Count('id') * 100.0 / total_events
+            count=Count('id')
         ).order_by('-count')[:10]
         
         self.stdout.write("\nTop Languages:")
         for lang in languages:
-            self.stdout.write(f"  {lang['language']}: {lang['count']} ({lang['percentage']:.1f}%)")
+            self.stdout.write(f"  {lang['language']}: {lang['count']} ({lang['count'] * 100.0 / total_events:.1f}%)")
         
         # VS Code version distribution
         versions = queryset.exclude(vs_code_version='').values('vs_code_version').annotate(
-            count=Count('id'),
-            percentage=Count('id') * 100.0 / total_events
+            count=Count('id')
         ).order_by('-count')[:5]
         
         self.stdout.write("\nVS Code Versions:")
         for ver in versions:
-            self.stdout.write(f"  {ver['vs_code_version']}: {ver['count']} ({ver['percentage']:.1f}%)")
+            self.stdout.write(f"  {ver['vs_code_version']}: {ver['count']} ({ver['count'] * 100.0 / total_events:.1f}%)")
         
         # Show error analysis if errors exist
         error_events = queryset.filter(event_name='shareError')
-        if error_events.exists():
+        error_count = error_events.count()
+        if error_count:
             self.stdout.write("\nError Analysis:")
-            self.stdout.write(f"  Total Errors: {error_events.count()}")
+            self.stdout.write(f"  Total Errors: {error_count}")
             
-            # Group errors
-            error_types = defaultdict(int)
-            for event in error_events:
-                error_msg = event.error_message or "Unknown error"
-                # Simplify error message for grouping
-                simplified_error = error_msg.split(':')[0] if ':' in error_msg else error_msg
-                error_types[simplified_error] += 1
+            # Group errors by the message up to the first colon, in SQL
+            error_types = error_events.annotate(
+                error_type=Func(
+                    Coalesce(NullIf('error_message', Value('')), Value('Unknown error')),
+                    Value(':'),
+                    Value(1),
+                    function='SPLIT_PART',
+                    output_field=CharField()
+                )
+            ).values('error_type').annotate(
+                count=Count('id')
+            ).order_by('-count')[:10]
             
-            for error_type, count in sorted(error_types.items(), key=lambda x: x[1], reverse=True)[:10]:
-                self.stdout.write(f"  {error_type}: {count}")
+            for error in error_types:
+                self.stdout.write(f"  {error['error_type']}: {error['count']}")
         
         # Daily activity
         self.stdout.write("\nDaily Activity:")
@@ -122,8 +138,7 @@ class Command(BaseCommand):
             self.stdout.write(f"  {date_data['timestamp__date']}: {date_data['count']} events")
         
         # Unique users
-        unique_users = queryset.values('client_id').distinct().count()
-        self.stdout.write(f"\nUnique Users: {unique_users}")
+        self.stdout.write(f"\nUnique Users: {totals['unique_users']}")
         
         # Export to CSV if requested
         if export_file:
@@ -132,19 +147,12 @@ class Command(BaseCommand):
     
     def export_to_csv(self, queryset, filename):
         """Export telemetry data to CSV file"""
+        fieldnames = ['timestamp', 'event_name', 'client_id', 'vs_code_version', 
+                    'language', 'code_length', 'error_message']
         with open(filename, 'w', newline='') as csvfile:
-            fieldnames = ['timestamp', 'event_name', 'client_id', 'vs_code_version', 
-                        'language', 'code_length', 'error_message']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
-            writer.writeheader()
-            for event in queryset:
-                writer.writerow({
-                    'timestamp': event.timestamp.isoformat(),
-                    'event_name': event.event_name,
-                    'client_id': event.client_id,
-                    'vs_code_version': event.vs_code_version,
-                    'language': event.language,
-                    'code_length': event.code_length,
-                    'error_message': event.error_message
-                })
\ No newline at end of file
+            writer = csv.writer(csvfile)
+            writer.writerow(fieldnames)
+            # Stream plain tuples so memory stays bounded to one chunk
+            rows = queryset.values_list(*fieldnames).iterator(chunk_size=2000)
+            for timestamp, *rest in rows:
+                writer.writerow((timestamp.isoformat(), *rest))
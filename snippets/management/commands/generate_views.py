@@ -5,34 +5,47 @@ Run this in Django shell: python manage.py shell < generate_views.py
 This script creates synthetic views to improve engagement metrics and populate analytics data.
 """
 
+import csv
+import io
 import random
-import hashlib
 import uuid
+from collections import Counter
+from itertools import accumulate
 from datetime import datetime, timedelta
 from django.utils import timezone
 from django.db import transaction, connection
-from django.db import models
-from snippets.models import Snippet, SnippetView, SnippetMetrics
+from psycopg2.extras import execute_values
+from snippets.models import (
+    Snippet, SnippetView, SnippetMetrics, VisitorStats,
+    SnippetDailyMetrics, SnippetViewDailyMetrics
+)
 
 print("Starting view generation for 2031 views...")
 
+_AGENTS = (
+    'Mozilla/5.0 (Chrome)',
+    'Mozilla/5.0 (Firefox)',
+    'Mozilla/5.0 (Safari)',
+    'Mozilla/5.0 (Edge)',
+)
+
 def get_snippet_candidates():
     """Get snippets that are good candidates for view generation"""
     return list(
-        Snippet.objects.select_related()
-        .order_by('created_at')
+        Snippet.objects.order_by('created_at')
         .values(
             'id', 'created_at', 'expires_at', 'language', 
             'view_count', 'is_encrypted', 'one_time_view'
         )
+        .iterator(chunk_size=1000)
     )
 
-def select_weighted_snippet(snippets, language_weights):
-    """Select a snippet with weighted probability based on language and recency"""
-    if not snippets:
-        return None
-        
-    # Calculate weights for each snippet
+def build_cumulative_weights(snippets, language_weights):
+    """
+    Cumulative selection weights based on language and recency. The inputs
+    don't change during a run, so this is computed once rather than per draw.
+    """
+    now = timezone.now()
     snippet_weights = []
     
     for snippet in snippets:
@@ -43,7 +56,7 @@ def select_weighted_snippet(snippets, language_weights):
         weight *= lang_weight
         
         # Recency weight (newer snippets more likely to be viewed)
-        days_old = (timezone.now() - snippet['created_at']).days
+        days_old = (now - snippet['created_at']).days
         recency_weight = max(0.1, 1.0 - (days_old / 30.0))  # Decay over 30 days
         weight *= recency_weight
         
@@ -59,136 +72,153 @@ def select_weighted_snippet(snippets, language_weights):
             
         snippet_weights.append(weight)
     
-    # Weighted random selection
-    if not snippet_weights or sum(snippet_weights) == 0:
-        return random.choice(snippets)
-        
-    return random.choices(snippets, weights=snippet_weights, k=1)[0]
+    return list(accumulate(snippet_weights))
 
-def generate_view_timestamp(created_at, expires_at, hour_weights):
-    """Generate a realistic timestamp between creation and expiration"""
-    # Ensure we're working with timezone-aware datetimes
-    if timezone.is_naive(created_at):
-        created_at = timezone.make_aware(created_at)
-    if timezone.is_naive(expires_at):
-        expires_at = timezone.make_aware(expires_at)
-        
-    # Calculate the valid time window
-    total_seconds = (expires_at - created_at).total_seconds()
-    
-    if total_seconds <= 0:
-        return None
-    
+def select_weighted_snippets(snippets, cum_weights, k):
+    """Draw k snippets with the precomputed cumulative weights"""
+    if not cum_weights or cum_weights[-1] == 0:
+        return random.choices(snippets, k=k)
+    return random.choices(snippets, cum_weights=cum_weights, k=k)
+
+def generate_view_timestamps(snippets, hour_weights):
+    """
+    Generate a realistic timestamp between creation and expiration for each
+    snippet, or None where the snippet has no valid window. The random
+    components are drawn for the whole batch up front.
+    """
+    count = len(snippets)
     # Most views happen in the first 25% of snippet lifetime
     # Some views happen throughout the lifetime
-    lifecycle_position = random.choices(
+    lifecycle_positions = random.choices(
         [0.25, 1.0],  # First quarter vs full lifetime
         weights=[0.7, 0.3],  # 70% in first quarter
-        k=1
-    )[0]
-    
-    # Random time within the selected portion
-    max_offset = total_seconds * lifecycle_position
-    time_offset = random.uniform(0, max_offset)
-    
-    base_time = created_at + timedelta(seconds=time_offset)
-    
+        k=count
+    )
     # Adjust to a weighted hour
-    target_hour = random.choices(
+    target_hours = random.choices(
         list(hour_weights.keys()),
         weights=list(hour_weights.values()),
-        k=1
-    )[0]
-    
-    # Set to target hour with some minute randomization
-    adjusted_time = base_time.replace(
-        hour=target_hour,
-        minute=random.randint(0, 59),
-        second=random.randint(0, 59)
+        k=count
     )
+    offsets = [random.random() for _ in range(count)]
+    minutes = random.choices(range(60), k=count)
+    seconds = random.choices(range(60), k=count)
     
-    # Ensure we don't go outside the valid window
-    if adjusted_time < created_at:
-        adjusted_time = created_at + timedelta(minutes=random.randint(1, 60))
-    elif adjusted_time > expires_at:
-        adjusted_time = expires_at - timedelta(minutes=random.randint(1, 60))
+    timestamps = []
+    for snippet, lifecycle_position, target_hour, offset, minute, second in zip(
+        snippets, lifecycle_positions, target_hours, offsets, minutes, seconds
+    ):
+        # USE_TZ is on, so these come back from the database tz-aware
+        created_at = snippet['created_at']
+        expires_at = snippet['expires_at']
+        
+        # Calculate the valid time window
+        total_seconds = (expires_at - created_at).total_seconds()
+        
+        if total_seconds <= 0:
+            timestamps.append(None)
+            continue
         
-    return adjusted_time
+        # Random time within the selected portion
+        base_time = created_at + timedelta(seconds=offset * total_seconds * lifecycle_position)
+        
+        # Set to target hour with some minute randomization
+        adjusted_time = base_time.replace(hour=target_hour, minute=minute, second=second)
+        
+        # Ensure we don't go outside the valid window
+        if adjusted_time < created_at:
+            adjusted_time = created_at + timedelta(minutes=random.randint(1, 60))
+        elif adjusted_time > expires_at:
+            adjusted_time = expires_at - timedelta(minutes=random.randint(1, 60))
+            
+        timestamps.append(adjusted_time)
+    
+    return timestamps
 
 def generate_simple_ip_hash():
     """Generate a simple IP hash without complex simulation"""
-    # Simple hash generation for consistency
-    fake_ip = f"192.168.{random.randint(1, 255)}.{random.randint(1, 255)}"
-    return hashlib.sha256(fake_ip.encode()).hexdigest()
+    # Synthetic data only needs the shape of a SHA-256 hex digest
+    return f"{random.getrandbits(256):064x}"
 
 def get_simple_user_agent():
     """Get a simple user agent string"""
-    agents = [
-        'Mozilla/5.0 (Chrome)',
-        'Mozilla/5.0 (Firefox)', 
-        'Mozilla/5.0 (Safari)',
-        'Mozilla/5.0 (Edge)'
-    ]
-    return random.choice(agents)
+    return random.choice(_AGENTS)
 
-def create_views_batch(views_data):
-    """Create view records in batch for performance with proper backdating"""
-    with transaction.atomic():
-        # Use raw SQL to bypass auto_now_add behavior and properly backdate records
-        with connection.cursor() as cursor:
-            # Prepare batch insert query
-            insert_query = """
-                INSERT INTO snippet_views (id, snippet_id, viewed_at, ip_hash, user_agent, location)
-                VALUES (%s, %s, %s, %s, %s, %s)
+def create_views(views_data):
+    """Create all view records with a single COPY, with proper backdating"""
+    # Write rows to an in-memory CSV; empty unquoted fields load as NULL
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for view in views_data:
+        writer.writerow([
+            uuid.uuid4(),  # Generate UUID for id
+            view['snippet_id'],
+            view['viewed_at'].isoformat(),
+            view['ip_hash'],
+            view['user_agent'],
+            SnippetView.browser_from_user_agent(view['user_agent']),
+            view['location']
+        ])
+    buf.seek(0)
+    
+    # Use raw SQL to bypass auto_now_add behavior and properly backdate records
+    with connection.cursor() as cursor:
+        cursor.cursor.copy_expert(
             """
-            
-            # Prepare batch data
-            batch_data = []
-            for view in views_data:
-                batch_data.append([
-                    str(uuid.uuid4()),  # Generate UUID for id
-                    str(view['snippet_id']),
-                    view['viewed_at'],
-                    view['ip_hash'],
-                    view['user_agent'],
-                    view['location']
-                ])
-            
-            # Execute batch insert
-            cursor.executemany(insert_query, batch_data)
+            COPY snippet_views (id, snippet_id, viewed_at, ip_hash, user_agent, browser, location)
+            FROM STDIN WITH CSV
+            """,
+            buf,
+        )
 
 def update_snippet_view_counts(views_data):
     """Update view counts for affected snippets"""
-    # Count views per snippet
-    snippet_view_counts = {}
+    # Count views per snippet and track the earliest of them
+    snippet_view_counts = Counter(view['snippet_id'] for view in views_data)
+    snippet_first_views = {}
     for view in views_data:
         snippet_id = view['snippet_id']
-        snippet_view_counts[snippet_id] = snippet_view_counts.get(snippet_id, 0) + 1
+        first_view = snippet_first_views.get(snippet_id)
+        if first_view is None or view['viewed_at'] < first_view:
+            snippet_first_views[snippet_id] = view['viewed_at']
     
-    # Update in batches
-    with transaction.atomic():
-        for snippet_id, count in snippet_view_counts.items():
-            Snippet.objects.filter(id=snippet_id).update(
-                view_count=models.F('view_count') + count
-            )
+    # Apply every snippet's increment in a single UPDATE joined to VALUES
+    rows = [
+        (str(snippet_id), count, snippet_first_views[snippet_id])
+        for snippet_id, count in snippet_view_counts.items()
+    ]
+    with connection.cursor() as cursor:
+        execute_values(
+            cursor.cursor,
+            """
+            UPDATE snippets SET
+                view_count = snippets.view_count + v.views,
+                first_viewed_at = LEAST(COALESCE(snippets.first_viewed_at, v.first_view), v.first_view)
+            FROM (VALUES %s) AS v(id, views, first_view)
+            WHERE snippets.id = v.id
+            """,
+            rows,
+            template="(%s::uuid, %s::integer, %s::timestamptz)",
+            page_size=len(rows),
+        )
 
 def update_daily_metrics(views_data):
     """Update daily metrics based on generated views"""
     # Group views by date
-    daily_counts = {}
-    for view in views_data:
-        date = view['viewed_at'].date()
-        daily_counts[date] = daily_counts.get(date, 0) + 1
+    daily_counts = Counter(view['viewed_at'].date() for view in views_data)
     
-    # Update metrics for each date
-    with transaction.atomic():
-        for date, count in daily_counts.items():
-            metrics, created = SnippetMetrics.objects.get_or_create(
-                date=date,
-                defaults={'total_views': 0, 'total_snippets': 0}
-            )
-            metrics.total_views += count
-            metrics.save(update_fields=['total_views'])
+    # Upsert every date in one statement
+    table = SnippetMetrics._meta.db_table
+    with connection.cursor() as cursor:
+        execute_values(
+            cursor.cursor,
+            f"""
+            INSERT INTO {table} (date, total_views, total_snippets) VALUES %s
+            ON CONFLICT (date) DO UPDATE SET
+                total_views = {table}.total_views + EXCLUDED.total_views
+            """,
+            [(date, count, 0) for date, count in daily_counts.items()],
+        )
 
 # Main execution
 try:
@@ -226,28 +256,25 @@ try:
         else:  # Night hours
             hour_weights[hour] = 0.3
     
-    # Generate views in batches
-    total_views_created = 0
+    cum_weights = build_cumulative_weights(snippets, language_weights)
+    
+    # Generate all views in memory first, in batches
+    views_data = []
+    # Local days whose rollup rows the generated views change
+    view_days = set()
+    created_days = set()
     
     for batch_start in range(0, TARGET_VIEWS, BATCH_SIZE):
-        batch_size = min(BATCH_SIZE, TARGET_VIEWS - total_views_created)
-        batch_views = []
+        batch_size = min(BATCH_SIZE, TARGET_VIEWS - len(views_data))
         
         print(f"Generating batch {batch_start//BATCH_SIZE + 1}...")
         
-        for _ in range(batch_size):
-            # Select snippet with weighted probability
-            snippet = select_weighted_snippet(snippets, language_weights)
-            if not snippet:
-                continue
-                
-            # Generate realistic view timestamp within snippet lifetime
-            view_time = generate_view_timestamp(
-                snippet['created_at'], 
-                snippet['expires_at'],
-                hour_weights
-            )
-            
+        # Select snippets with weighted probability, then a realistic view
+        # timestamp within each one's lifetime
+        selected = select_weighted_snippets(snippets, cum_weights, batch_size)
+        view_times = generate_view_timestamps(selected, hour_weights)
+        
+        for snippet, view_time in zip(selected, view_times):
             if not view_time:
                 continue
             
@@ -260,22 +287,31 @@ try:
                 'location': None  # Keep simple
             }
             
-            batch_views.append(view)
+            views_data.append(view)
+            view_days.add(timezone.localdate(view_time))
+            created_days.add(timezone.localdate(snippet['created_at']))
         
-        if batch_views:
+        if len(views_data) >= TARGET_VIEWS:
+            break
+    
+    # Write everything in one transaction so the run lands all-or-nothing
+    if views_data:
+        with transaction.atomic():
             # Create the views
-            create_views_batch(batch_views)
+            create_views(views_data)
             # Update snippet view counts
-            update_snippet_view_counts(batch_views)
+            update_snippet_view_counts(views_data)
             # Update daily metrics
-            update_daily_metrics(batch_views)
-            
-            total_views_created += len(batch_views)
-            print(f"  Created {len(batch_views)} views (Total: {total_views_created})")
-        
-        if total_views_created >= TARGET_VIEWS:
-            break
+            update_daily_metrics(views_data)
+            # Raw inserts bypass SnippetView.save(), so refresh per-visitor totals
+            VisitorStats.rebuild()
+            # Backdated views land on past days the beat rollup never revisits
+            for day in sorted(view_days):
+                SnippetViewDailyMetrics.rollup(day)
+            for day in sorted(created_days):
+                SnippetDailyMetrics.rollup(day)
     
+    total_views_created = len(views_data)
     print(f"\n✅ SUCCESS: Created {total_views_created} view records")
     print(f"📊 This should significantly improve your engagement metrics!")
     
@@ -0,0 +1,38 @@
+# snippets/management/commands/rollup_daily_metrics.py
+
+from datetime import datetime, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from snippets.models import SnippetDailyMetrics, SnippetViewDailyMetrics
+
+
+class Command(BaseCommand):
+    help = 'Roll up daily snippet and view counters into the summary tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            type=str,
+            help='Roll up a single day (YYYY-MM-DD)'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=1,
+            help='Roll up this many days ending today (default: 1, today only)'
+        )
+
+    def handle(self, *args, **options):
+        if options['date']:
+            try:
+                days = [datetime.strptime(options['date'], '%Y-%m-%d').date()]
+            except ValueError:
+                raise CommandError(f"Invalid date: {options['date']}")
+        else:
+            today = timezone.now().date()
+            days = [today - timedelta(days=offset) for offset in range(options['days'])]
+
+        for day in days:
+            SnippetDailyMetrics.rollup(day)
+            SnippetViewDailyMetrics.rollup(day)
+            self.stdout.write(f"Rolled up metrics for {day}")
@@ -0,0 +1,113 @@
+# Generated by Django 5.1.5 on 2026-10-16 09:12
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_daily_metrics(apps, schema_editor):
+    """
+    Roll up every existing day so the trend windows cover history from the
+    start, not just the days since deploy. Same grouping as the model rollups,
+    but for all days in one pass each.
+    """
+    Snippet = apps.get_model("snippets", "Snippet")
+    SnippetView = apps.get_model("snippets", "SnippetView")
+    SnippetDailyMetrics = apps.get_model("snippets", "SnippetDailyMetrics")
+    SnippetViewDailyMetrics = apps.get_model("snippets", "SnippetViewDailyMetrics")
+
+    rows = (
+        Snippet.objects
+        .annotate(day=TruncDate("created_at"))
+        .values("day", "language")
+        .annotate(
+            created=Count("id"),
+            encrypted=Count("id", filter=Q(is_encrypted=True)),
+            password_protected=Count("id", filter=Q(password_hash__isnull=False)),
+            one_time=Count("id", filter=Q(one_time_view=True)),
+            views_total=Sum("view_count"),
+        )
+    )
+    SnippetDailyMetrics.objects.bulk_create(
+        [
+            SnippetDailyMetrics(
+                date=row["day"],
+                language=row["language"],
+                created=row["created"],
+                encrypted=row["encrypted"],
+                password_protected=row["password_protected"],
+                one_time=row["one_time"],
+                views_total=row["views_total"] or 0,
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+    views = (
+        SnippetView.objects
+        .annotate(day=TruncDate("viewed_at"))
+        .values("day")
+        .annotate(views=Count("id"))
+    )
+    SnippetViewDailyMetrics.objects.bulk_create(
+        [SnippetViewDailyMetrics(date=row["day"], views=row["views"]) for row in views],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("snippets", "0012_remove_snippet_encryption_salt_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SnippetDailyMetrics",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("language", models.CharField(max_length=50)),
+                ("created", models.PositiveIntegerField(default=0)),
+                ("encrypted", models.PositiveIntegerField(default=0)),
+                ("password_protected", models.PositiveIntegerField(default=0)),
+                ("one_time", models.PositiveIntegerField(default=0)),
+                ("views_total", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "snippet_daily_metrics",
+                "unique_together": {("date", "language")},
+            },
+        ),
+        migrations.CreateModel(
+            name="SnippetViewDailyMetrics",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(unique=True)),
+                ("views", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "snippet_view_daily_metrics",
+            },
+        ),
+        migrations.RunPython(backfill_daily_metrics, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.5 on 2026-10-16 10:03
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("snippets", "0013_snippetdailymetrics_snippetviewdailymetrics"),
+    ]
+
+    operations = [
+        # Matches the ExtractHour('viewed_at') expression Django emits under
+        # TIME_ZONE = "Africa/Lagos"; AT TIME ZONE keeps it IMMUTABLE.
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_snippetview_hour "
+                "ON snippet_views ((EXTRACT(HOUR FROM (viewed_at AT TIME ZONE 'Africa/Lagos'))), viewed_at);"
+            ),
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS idx_snippetview_hour;",
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.5 on 2026-10-16 10:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("snippets", "0014_snippetview_hour_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="snippetview",
+            name="browser",
+            field=models.CharField(db_index=True, default="Other", max_length=16),
+        ),
+        # Backfill with the same classification the analytics report used
+        migrations.RunSQL(
+            sql="""
+                UPDATE snippet_views SET browser = CASE
+                    WHEN user_agent LIKE '%Chrome%' THEN 'Chrome'
+                    WHEN user_agent LIKE '%Firefox%' THEN 'Firefox'
+                    WHEN user_agent LIKE '%Safari%' THEN 'Safari'
+                    WHEN user_agent LIKE '%Edge%' THEN 'Edge'
+                    ELSE 'Other'
+                END;
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
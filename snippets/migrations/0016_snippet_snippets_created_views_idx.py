@@ -0,0 +1,23 @@
+# Generated by Django 5.1.5 on 2026-10-16 11:20
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("snippets", "0015_snippetview_browser"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="snippet",
+            index=models.Index(
+                fields=["created_at", "-view_count"],
+                name="snippets_created_views_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.5 on 2026-10-16 11:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("snippets", "0016_snippet_snippets_created_views_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="snippet",
+            name="is_password_protected",
+            field=models.BooleanField(db_default=False, default=False),
+        ),
+        migrations.RunSQL(
+            sql="UPDATE snippets SET is_password_protected = (password_hash IS NOT NULL);",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.5 on 2026-10-16 11:58
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("snippets", "0017_snippet_is_password_protected"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="snippet",
+            index=models.Index(
+                condition=models.Q(("is_password_protected", True)),
+                fields=["is_password_protected"],
+                name="idx_snippets_pwd",
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.5 on 2026-10-16 13:05
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("snippets", "0018_snippet_idx_snippets_pwd"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="snippetview",
+            index=models.Index(
+                fields=["viewed_at"], name="snippet_views_viewed_at_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.5 on 2026-10-16 13:31
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("snippets", "0019_snippetview_snippet_views_viewed_at_idx"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="snippet",
+            index=models.Index(
+                fields=["created_at", "language"],
+                include=(
+                    "view_count",
+                    "is_encrypted",
+                    "is_password_protected",
+                    "one_time_view",
+                ),
+                name="idx_snip_lang_covering",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="vscodetelemetryevent",
+            index=models.Index(
+                fields=["timestamp", "event_name"],
+                include=("client_id", "language", "code_length"),
+                name="idx_vscode_ts_covering",
+            ),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.5 on 2026-10-16 14:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("snippets", "0020_covering_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VisitorStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("ip_hash", models.CharField(max_length=64, unique=True)),
+                ("first_visit", models.DateTimeField()),
+                ("last_visit", models.DateTimeField(db_index=True)),
+                ("total_views", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "db_table": "visitor_stats",
+            },
+        ),
+        migrations.RunSQL(
+            sql="""
+                INSERT INTO visitor_stats (ip_hash, first_visit, last_visit, total_views)
+                SELECT ip_hash, MIN(viewed_at), MAX(viewed_at), COUNT(*)
+                FROM snippet_views
+                GROUP BY ip_hash;
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.5 on 2026-10-16 14:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("snippets", "0021_visitorstats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="snippet",
+            name="first_viewed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE snippets SET first_viewed_at = first_views.viewed_at
+                FROM (
+                    SELECT snippet_id, MIN(viewed_at) AS viewed_at
+                    FROM snippet_views
+                    GROUP BY snippet_id
+                ) AS first_views
+                WHERE first_views.snippet_id = snippets.id;
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.5 on 2026-10-16 15:40
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("snippets", "0022_snippet_first_viewed_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="snippet",
+            name="content_length",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.db.models.functions.text.Length("content"),
+                output_field=models.PositiveIntegerField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="snippet",
+            index=models.Index(
+                fields=["created_at", "content_length"],
+                name="snippets_created_len_idx",
+            ),
+        ),
+    ]
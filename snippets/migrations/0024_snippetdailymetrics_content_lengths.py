@@ -0,0 +1,100 @@
+# Generated by Django 5.1.5 on 2026-10-16 16:12
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Q, Sum
+from django.db.models.functions import TruncDate
+
+
+def rollup_content_lengths(apps, schema_editor):
+    """
+    Fill the new length columns on existing rollup rows, so past days don't
+    report zero lengths. Bucket bounds match LengthBucket.
+    """
+    Snippet = apps.get_model("snippets", "Snippet")
+    SnippetDailyMetrics = apps.get_model("snippets", "SnippetDailyMetrics")
+
+    metrics = {
+        (row.date, row.language): row
+        for row in SnippetDailyMetrics.objects.only("id", "date", "language")
+    }
+    if not metrics:
+        return
+
+    rows = (
+        Snippet.objects
+        .annotate(day=TruncDate("created_at"))
+        .filter(day__in={date for date, _ in metrics})
+        .values("day", "language")
+        .annotate(
+            length_total=Sum("content_length"),
+            length_min=Min("content_length"),
+            length_max=Max("content_length"),
+            very_short=Count("id", filter=Q(content_length__lt=100)),
+            short=Count("id", filter=Q(content_length__gte=100, content_length__lt=501)),
+            medium=Count("id", filter=Q(content_length__gte=501, content_length__lt=2001)),
+            long=Count("id", filter=Q(content_length__gte=2001, content_length__lt=10001)),
+            very_long=Count("id", filter=Q(content_length__gte=10001)),
+        )
+    )
+    fields = ("length_total", "length_min", "length_max",
+              "very_short", "short", "medium", "long", "very_long")
+    updated = []
+    for row in rows:
+        entry = metrics.get((row["day"], row["language"]))
+        if entry is None:
+            continue
+        for field in fields:
+            setattr(entry, field, row[field])
+        updated.append(entry)
+    SnippetDailyMetrics.objects.bulk_update(updated, fields, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("snippets", "0023_snippet_content_length"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="snippetdailymetrics",
+            name="length_total",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="snippetdailymetrics",
+            name="length_min",
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="snippetdailymetrics",
+            name="length_max",
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="snippetdailymetrics",
+            name="very_short",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="snippetdailymetrics",
+            name="short",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="snippetdailymetrics",
+            name="medium",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="snippetdailymetrics",
+            name="long",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="snippetdailymetrics",
+            name="very_long",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(rollup_content_lengths, migrations.RunPython.noop),
+    ]
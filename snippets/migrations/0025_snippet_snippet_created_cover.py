@@ -0,0 +1,31 @@
+# Generated by Django 5.1.5 on 2026-10-16 15:02
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("snippets", "0024_snippetdailymetrics_content_lengths"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="snippet",
+            index=models.Index(
+                fields=["created_at"],
+                include=(
+                    "is_encrypted",
+                    "content_length",
+                    "view_count",
+                    "parent_snippet",
+                    "first_viewed_at",
+                    "expires_at",
+                ),
+                name="snippet_created_cover",
+            ),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.5 on 2026-10-16 15:20
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("snippets", "0025_snippet_snippet_created_cover"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name="snippet",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("content"),
+                    name="gin_trgm_ops",
+                ),
+                name="snippet_content_trgm",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="snippet",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("public_name"),
+                    name="gin_trgm_ops",
+                ),
+                name="snippet_public_name_trgm",
+            ),
+        ),
+    ]
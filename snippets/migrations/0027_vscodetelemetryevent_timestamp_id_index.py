@@ -0,0 +1,29 @@
+# Generated by Django 5.1.5 on 2026-10-16 16:05
+
+from django.contrib.postgres.operations import (
+    AddIndexConcurrently,
+    RemoveIndexConcurrently,
+)
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("snippets", "0026_snippet_trigram_search_indexes"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="vscodetelemetryevent",
+            index=models.Index(
+                fields=["timestamp", "id"], name="vscode_tele_ts_id_idx"
+            ),
+        ),
+        RemoveIndexConcurrently(
+            model_name="vscodetelemetryevent",
+            name="vscode_tele_timesta_59cd04_idx",
+        ),
+    ]
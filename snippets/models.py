@@ -1,30 +1,41 @@
 # models.py
 import uuid
 from django.db import models
-from django.db.models import F
+from django.db.models import F, Q, Count, Sum, Min, Max, Value
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db.models.functions import Coalesce, Length, Upper
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, time, timedelta
 import secrets
 import hashlib
-from django.db import transaction
-from django.core.cache import cache
+from django.db import connection, transaction
 from cryptography.fernet import Fernet
 from django.conf import settings
 import base64
+from . import counters, realtime
 
 class Snippet(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     content = models.TextField()
+    # Kept by Postgres so analytics never re-measures content row by row
+    content_length = models.GeneratedField(
+        expression=Length('content'),
+        output_field=models.PositiveIntegerField(),
+        db_persist=True,
+    )
     language = models.CharField(max_length=50)
     created_at = models.DateTimeField(auto_now_add=True)
     expires_at = models.DateTimeField()
     view_count = models.IntegerField(default=0)
+    first_viewed_at = models.DateTimeField(null=True, blank=True)
     access_token = models.CharField(max_length=100, unique=True)
     is_encrypted = models.BooleanField(default=False)
     one_time_view = models.BooleanField(default=False)
     # Password protection fields
     password_hash = models.CharField(max_length=128, null=True, blank=True)
     password_salt = models.CharField(max_length=128, null=True, blank=True)
+    # Denormalized from password_hash so analytics can count from a partial index
+    is_password_protected = models.BooleanField(default=False, db_default=False)
     # Versioning fields
     parent_snippet = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='versions')
     version = models.PositiveIntegerField(default=1)
@@ -45,6 +56,30 @@ class Snippet(models.Model):
             models.Index(fields=['access_token']),
             models.Index(fields=['expires_at']),
             models.Index(fields=['is_public', 'expires_at', 'created_at']),
+            models.Index(fields=['created_at', '-view_count'], name='snippets_created_views_idx'),
+            models.Index(
+                fields=['is_password_protected'],
+                name='idx_snippets_pwd',
+                condition=models.Q(is_password_protected=True),
+            ),
+            # Covers the per-language rollup so it can run as an index-only scan
+            models.Index(
+                fields=['created_at', 'language'],
+                name='idx_snip_lang_covering',
+                include=['view_count', 'is_encrypted', 'is_password_protected', 'one_time_view'],
+            ),
+            models.Index(fields=['created_at', 'content_length'], name='snippets_created_len_idx'),
+            # Trigram indexes on UPPER(col) match Django's icontains SQL, so
+            # admin searches over content no longer scan the whole table
+            GinIndex(OpClass(Upper('content'), name='gin_trgm_ops'), name='snippet_content_trgm'),
+            GinIndex(OpClass(Upper('public_name'), name='gin_trgm_ops'), name='snippet_public_name_trgm'),
+            # Lets the performance analytics aggregates run as index-only scans
+            models.Index(
+                fields=['created_at'],
+                name='snippet_created_cover',
+                include=['is_encrypted', 'content_length', 'view_count',
+                         'parent_snippet', 'first_viewed_at', 'expires_at'],
+            ),
         ]
 
     def save(self, *args, **kwargs):
@@ -54,7 +89,11 @@ class Snippet(models.Model):
         if not self.access_token:
             # Generate a secure random token
             self.access_token = secrets.token_urlsafe(32)
+        self.is_password_protected = self.password_hash is not None
+        adding = self._state.adding
         super().save(*args, **kwargs)
+        if adding:
+            realtime.record('snippets')
 
     def set_password(self, password):
         """Hash password and store it"""
@@ -124,9 +163,12 @@ class Snippet(models.Model):
 
     def increment_view_count(self):
         """Atomically increment view count to avoid race conditions."""
-        Snippet.objects.filter(pk=self.pk).update(view_count=F('view_count') + 1)
-        # Refresh instance field for in-memory calculations
-        self.refresh_from_db(fields=['view_count'])
+        Snippet.objects.filter(pk=self.pk).update(
+            view_count=F('view_count') + 1,
+            first_viewed_at=Coalesce('first_viewed_at', Value(timezone.now())),
+        )
+        # Refresh instance fields for in-memory calculations
+        self.refresh_from_db(fields=['view_count', 'first_viewed_at'])
     
     def get_sharing_url(self, base_url):
         return f"{base_url}/s/{self.id}?token={self.access_token}"
@@ -222,40 +264,81 @@ class Snippet(models.Model):
                 models.Q(parent_snippet=self)
             ).order_by('version')
 
-    @classmethod
-    def record_snippet_creation(cls):
-        # Use cache to reduce database hits
-        cache_key = f'snippet_metrics_{timezone.now().date()}'
-        
-        # Increment in cache first
-        current_count = cache.get(cache_key, 0) + 1
-        cache.set(cache_key, current_count, 3600)  # Cache for 1 hour
-        
-        # Batch update to reduce database writes
-        if current_count % 10 == 0:
-            with transaction.atomic():
-                today = timezone.now().date()
-                obj, created = SnippetMetrics.objects.get_or_create(date=today)
-                obj.total_snippets += current_count
-                obj.save(update_fields=['total_snippets'])
-                
-                # Reset cache after database update
-                cache.delete(cache_key)
-
 class SnippetView(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     snippet = models.ForeignKey(Snippet, on_delete=models.CASCADE, related_name='views')
     viewed_at = models.DateTimeField(auto_now_add=True)
     ip_hash = models.CharField(max_length=64)
     user_agent = models.CharField(max_length=255)
+    browser = models.CharField(max_length=16, default='Other', db_index=True)
     location = models.CharField(max_length=255, null=True, blank=True)
 
+    # Checked in order, so Edge's "Chrome" token classifies it as Chrome
+    BROWSER_TOKENS = ('Chrome', 'Firefox', 'Safari', 'Edge')
+
     class Meta:
         db_table = 'snippet_views'
         indexes = [
             models.Index(fields=['snippet', 'viewed_at']),
+            models.Index(fields=['viewed_at'], name='snippet_views_viewed_at_idx'),
         ]
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        if adding:
+            self.browser = self.browser_from_user_agent(self.user_agent)
+        super().save(*args, **kwargs)
+        if adding:
+            VisitorStats.record_visit(self.ip_hash, self.viewed_at)
+            realtime.record('views', ip_hash=self.ip_hash)
+
+    @classmethod
+    def browser_from_user_agent(cls, user_agent):
+        """Map a raw user agent onto one of the reported browser buckets"""
+        for token in cls.BROWSER_TOKENS:
+            if token in (user_agent or ''):
+                return token
+        return 'Other'
+
+
+class VisitorStats(models.Model):
+    """
+    Running per-visitor totals, upserted on every SnippetView insert so
+    retention analysis reads one row per visitor instead of re-grouping
+    snippet_views. Costs one extra write per view.
+    """
+    ip_hash = models.CharField(max_length=64, unique=True)
+    first_visit = models.DateTimeField()
+    last_visit = models.DateTimeField(db_index=True)
+    total_views = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'visitor_stats'
+
+    @classmethod
+    def record_visit(cls, ip_hash, viewed_at):
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO visitor_stats (ip_hash, first_visit, last_visit, total_views)
+                VALUES (%s, %s, %s, 1)
+                ON CONFLICT (ip_hash) DO UPDATE SET
+                    total_views = visitor_stats.total_views + 1,
+                    first_visit = LEAST(visitor_stats.first_visit, EXCLUDED.first_visit),
+                    last_visit = GREATEST(visitor_stats.last_visit, EXCLUDED.last_visit)
+            """, [ip_hash, viewed_at, viewed_at])
+
+    @classmethod
+    def rebuild(cls):
+        """Recompute every row from snippet_views, for rows inserted around save()"""
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("DELETE FROM visitor_stats")
+            cursor.execute("""
+                INSERT INTO visitor_stats (ip_hash, first_visit, last_visit, total_views)
+                SELECT ip_hash, MIN(viewed_at), MAX(viewed_at), COUNT(*)
+                FROM snippet_views
+                GROUP BY ip_hash
+            """)
+
 
 class SnippetMetrics(models.Model):
     date = models.DateField(unique=True)  # Store metrics per day
@@ -265,19 +348,134 @@ class SnippetMetrics(models.Model):
     class Meta:
         db_table = "snippet_metrics"
 
+    # Counted in the cache and written out by tasks.flush_snippet_metrics
     @classmethod
     def record_snippet_creation(cls):
-        today = timezone.now().date()
-        obj, created = cls.objects.get_or_create(date=today)
-        obj.total_snippets += 1
-        obj.save(update_fields=['total_snippets'])
+        cls._record('total_snippets', 'snippet_metrics')
 
     @classmethod
     def record_snippet_view(cls):
+        cls._record('total_views', 'snippet_view_metrics')
+
+    @classmethod
+    def _record(cls, field, key_prefix):
         today = timezone.now().date()
-        obj, created = cls.objects.get_or_create(date=today)
-        obj.total_views += 1
-        obj.save(update_fields=['total_views'])
+        if counters.incr(f'{key_prefix}_{today}') is None:
+            # Cache is down; count straight into the database instead
+            cls.objects.get_or_create(date=today)
+            cls.objects.filter(date=today).update(**{field: F(field) + 1})
+
+
+class LengthBucket(models.Func):
+    """
+    Postgres ``width_bucket`` over the content length bounds: 0 = very short
+    (< 100), 1 = short, 2 = medium, 3 = long, 4 = very long (> 10000)
+    """
+    function = 'width_bucket'
+    template = '%(function)s(%(expressions)s, ARRAY[100, 501, 2001, 10001])'
+    output_field = models.IntegerField()
+
+
+LENGTH_BUCKETS = ('very_short', 'short', 'medium', 'long', 'very_long')
+
+# First key of the pg_advisory_xact_lock taken per rolled-up day
+ROLLUP_LOCK_CLASS = 4104
+
+
+class SnippetDailyMetrics(models.Model):
+    """Per-day, per-language snippet counters rolled up from the snippets table"""
+    date = models.DateField()
+    language = models.CharField(max_length=50)
+    created = models.PositiveIntegerField(default=0)
+    encrypted = models.PositiveIntegerField(default=0)
+    password_protected = models.PositiveIntegerField(default=0)
+    one_time = models.PositiveIntegerField(default=0)
+    views_total = models.PositiveIntegerField(default=0)
+    # Content length totals and buckets for the content analysis report
+    length_total = models.PositiveBigIntegerField(default=0)
+    length_min = models.PositiveIntegerField(null=True)
+    length_max = models.PositiveIntegerField(null=True)
+    very_short = models.PositiveIntegerField(default=0)
+    short = models.PositiveIntegerField(default=0)
+    medium = models.PositiveIntegerField(default=0)
+    long = models.PositiveIntegerField(default=0)
+    very_long = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "snippet_daily_metrics"
+        unique_together = ('date', 'language')
+
+    @staticmethod
+    def day_bounds(day):
+        """Half-open [start, end) timestamps for ``day`` in the current timezone"""
+        start = timezone.make_aware(datetime.combine(day, time.min))
+        end = timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+        return start, end
+
+    @classmethod
+    def rollup(cls, day):
+        """Recompute the rows for ``day`` from the live snippets table"""
+        start, end = cls.day_bounds(day)
+        # One group per (language, length bucket) instead of five conditional
+        # counters evaluated on every row; the buckets are folded below
+        rows = (
+            Snippet.objects
+            .filter(created_at__gte=start, created_at__lt=end)
+            .values('language', bucket=LengthBucket('content_length'))
+            .annotate(
+                created=Count('id'),
+                encrypted=Count('id', filter=Q(is_encrypted=True)),
+                password_protected=Count('id', filter=Q(is_password_protected=True)),
+                one_time=Count('id', filter=Q(one_time_view=True)),
+                views_total=Sum('view_count'),
+                length_total=Sum('content_length'),
+                length_min=Min('content_length'),
+                length_max=Max('content_length'),
+            )
+        )
+        summed = ('created', 'encrypted', 'password_protected', 'one_time',
+                  'views_total', 'length_total')
+        metrics = {}
+        with transaction.atomic():
+            # Serialise rollups of the same day, or two concurrent delete and
+            # bulk_create passes would collide on (date, language)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT pg_advisory_xact_lock(%s, %s)",
+                    [ROLLUP_LOCK_CLASS, day.toordinal()],
+                )
+            for row in rows:
+                entry = metrics.get(row['language'])
+                if entry is None:
+                    entry = metrics[row['language']] = cls(date=day, language=row['language'])
+                    entry.length_min = row['length_min']
+                    entry.length_max = row['length_max']
+                for field in summed:
+                    setattr(entry, field, getattr(entry, field) + row[field])
+                entry.length_min = min(entry.length_min, row['length_min'])
+                entry.length_max = max(entry.length_max, row['length_max'])
+                bucket = LENGTH_BUCKETS[row['bucket']]
+                setattr(entry, bucket, getattr(entry, bucket) + row['created'])
+            cls.objects.filter(date=day).delete()
+            cls.objects.bulk_create(metrics.values())
+
+
+class SnippetViewDailyMetrics(models.Model):
+    """Per-day view counts rolled up from the snippet_views table"""
+    date = models.DateField(unique=True)
+    views = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "snippet_view_daily_metrics"
+
+    @classmethod
+    def rollup(cls, day):
+        """Recompute the row for ``day`` from the live snippet_views table"""
+        start, end = SnippetDailyMetrics.day_bounds(day)
+        views = SnippetView.objects.filter(viewed_at__gte=start, viewed_at__lt=end).count()
+        cls.objects.update_or_create(date=day, defaults={'views': views})
 
 
 class SnippetDiff(models.Model):
@@ -355,8 +553,9 @@ class VSCodeExtensionMetrics(models.Model):
         
         # Track total actions
         action_cache_key = f'vscode_actions_{today}'
-        current_count = cache.get(action_cache_key, 0) + 1
-        cache.set(action_cache_key, current_count, 3600)  # Cache for 1 hour
+        if counters.incr(action_cache_key) is None:
+            # Cache is down; telemetry is best-effort, so drop the action
+            return
         
         # Track specific action type
         type_cache_key = None
@@ -366,49 +565,17 @@ class VSCodeExtensionMetrics(models.Model):
             type_cache_key = f'vscode_files_{today}'
             
         if type_cache_key:
-            type_count = cache.get(type_cache_key, 0) + 1
-            cache.set(type_cache_key, type_count, 3600)
+            counters.incr(type_cache_key)
         
         # Track errors
         if is_error:
             error_cache_key = f'vscode_errors_{today}'
-            error_count = cache.get(error_cache_key, 0) + 1
-            cache.set(error_cache_key, error_count, 3600)
+            counters.incr(error_cache_key)
         
-        # Track unique clients (using a set in cache)
-        client_set_key = f'vscode_clients_{today}'
-        client_set = cache.get(client_set_key, set())
-        client_set.add(client_id)
-        cache.set(client_set_key, client_set, 3600)
-        
-        # Batch update to database periodically
-        if current_count % 10 == 0:
-            with transaction.atomic():
-                obj, created = cls.objects.get_or_create(date=today)
-                
-                # Update counts
-                obj.total_actions += current_count
-                
-                if type_cache_key == f'vscode_selections_{today}':
-                    obj.selection_shares += cache.get(type_cache_key, 0)
-                    cache.delete(type_cache_key)
-                
-                if type_cache_key == f'vscode_files_{today}':
-                    obj.file_shares += cache.get(type_cache_key, 0)
-                    cache.delete(type_cache_key)
-                
-                if is_error:
-                    obj.error_count += cache.get(error_cache_key, 0)
-                    cache.delete(error_cache_key)
-                
-                # Update unique clients count
-                obj.unique_clients = len(client_set)
-                
-                obj.save()
-                
-                # Reset cache after database update
-                cache.delete(action_cache_key)
-                
+        # Track unique clients (using a Redis set); flush_vscode_metrics writes
+        # all of these out to the database
+        counters.add_member(f'vscode_clients_{today}', client_id)
+
 
 class VSCodeTelemetryEvent(models.Model):
     """Stores raw telemetry events from VSCode extension for detailed analysis"""
@@ -427,7 +594,14 @@ class VSCodeTelemetryEvent(models.Model):
         db_table = "vscode_telemetry_events"
         indexes = [
             models.Index(fields=['event_name', 'timestamp']),
-            models.Index(fields=['timestamp']),
+            # Keyset order for the batched cleanup_telemetry deletes
+            models.Index(fields=['timestamp', 'id'], name='vscode_tele_ts_id_idx'),
+            # Covers the VS Code analytics aggregates over a timestamp window
+            models.Index(
+                fields=['timestamp', 'event_name'],
+                name='idx_vscode_ts_covering',
+                include=['client_id', 'language', 'code_length'],
+            ),
         ]
     
     @classmethod
@@ -458,6 +632,9 @@ class VSCodeTelemetryEvent(models.Model):
                 request_data=request_data  # Store the full request data
             )
             event.save()
+            realtime.record('vscode')
+            if event.event_name == 'shareError':
+                realtime.record('vscode_errors')
             return event
         except Exception as e:
             # Log error but don't fail - telemetry should be non-blocking
@@ -0,0 +1,66 @@
+# snippets/realtime.py
+"""
+Per-minute Redis counters backing the real-time analytics endpoint.
+
+Writes are best-effort: a Redis hiccup must never fail a snippet create or
+view, and the reader returns None so callers can fall back to the database.
+"""
+import time
+
+from django_redis import get_redis_connection
+
+# Buckets outlive the one-hour read window so late readers still see them
+BUCKET_TTL = 2 * 60 * 60
+WINDOW_MINUTES = 60
+STARTED_KEY = 'rt:started'
+
+
+def _minute(ts=None):
+    return int((ts if ts is not None else time.time()) // 60)
+
+
+def record(kind, ip_hash=None):
+    """Count one ``kind`` event in the current minute, plus its visitor if given"""
+    minute = _minute()
+    try:
+        conn = get_redis_connection('default')
+        pipe = conn.pipeline()
+        pipe.set(STARTED_KEY, minute, nx=True)
+        pipe.incr(f'rt:{kind}:{minute}')
+        pipe.expire(f'rt:{kind}:{minute}', BUCKET_TTL)
+        if ip_hash:
+            pipe.pfadd(f'rt:ips:{minute}', ip_hash)
+            pipe.expire(f'rt:ips:{minute}', BUCKET_TTL)
+        pipe.execute()
+    except Exception:
+        pass
+
+
+def last_hour(kinds, now=None):
+    """
+    Sum the last hour of buckets for each of ``kinds`` and estimate unique
+    visitors. Returns None until counters cover a full hour or if Redis is
+    unreachable.
+    """
+    current = _minute(now.timestamp() if now is not None else None)
+    minutes = range(current - WINDOW_MINUTES + 1, current + 1)
+    try:
+        conn = get_redis_connection('default')
+        started = conn.get(STARTED_KEY)
+        if started is None or int(started) > minutes[0]:
+            return None
+
+        pipe = conn.pipeline()
+        for kind in kinds:
+            pipe.mget([f'rt:{kind}:{m}' for m in minutes])
+        pipe.pfcount(*[f'rt:ips:{m}' for m in minutes])
+        *buckets, unique_ips = pipe.execute()
+    except Exception:
+        return None
+
+    counts = {
+        kind: sum(int(value) for value in values if value is not None)
+        for kind, values in zip(kinds, buckets)
+    }
+    counts['unique_ips'] = unique_ips
+    return counts
@@ -1,74 +1,86 @@
 from celery import shared_task
-from django.core.cache import cache
 from django.utils import timezone
 from django.db import transaction
-from django.db.models import Count
+from django.db.models import Count, F
 from django.core.management import call_command
 from datetime import timedelta
-from .models import SnippetMetrics, VSCodeExtensionMetrics, VSCodeTelemetryEvent
+from . import counters
+from .models import SnippetDailyMetrics, SnippetMetrics, VSCodeExtensionMetrics, VSCodeTelemetryEvent
 
-@shared_task
-def flush_snippet_metrics():
+def _flush_days():
+    """Yesterday as well as today, so counts made after the last flush before midnight still land"""
     today = timezone.now().date()
+    return (today - timedelta(days=1), today)
 
-    # Existing snippet and view metrics
-    snippet_cache_key = f'snippet_metrics_{today}'
-    view_cache_key = f'snippet_view_metrics_{today}'
+@shared_task
+def flush_snippet_metrics():
+    for day in _flush_days():
+        # Existing snippet and view metrics
+        snippet_cache_key = f'snippet_metrics_{day}'
+        view_cache_key = f'snippet_view_metrics_{day}'
 
-    snippet_count = cache.get(snippet_cache_key, 0)
-    view_count = cache.get(view_cache_key, 0)
+        snippet_count = counters.peek(snippet_cache_key)
+        view_count = counters.peek(view_cache_key)
 
-    if snippet_count or view_count:
-        with transaction.atomic():
-            obj, created = SnippetMetrics.objects.get_or_create(date=today)
-            obj.total_snippets += snippet_count
-            obj.total_views += view_count
-            obj.save(update_fields=['total_snippets', 'total_views'])
+        if snippet_count or view_count:
+            with transaction.atomic():
+                SnippetMetrics.objects.get_or_create(date=day)
+                SnippetMetrics.objects.filter(date=day).update(
+                    total_snippets=F('total_snippets') + snippet_count,
+                    total_views=F('total_views') + view_count,
+                )
 
-        # Clear cache after saving to DB
-        cache.delete(snippet_cache_key)
-        cache.delete(view_cache_key)
+            # Subtract what was saved so increments made meanwhile carry over
+            counters.drain(snippet_cache_key, snippet_count)
+            counters.drain(view_cache_key, view_count)
 
 @shared_task
 def flush_vscode_metrics():
-    today = timezone.now().date()
-    
-    # Get all VS Code metrics from cache
-    actions_key = f'vscode_actions_{today}'
-    selections_key = f'vscode_selections_{today}'
-    files_key = f'vscode_files_{today}'
-    errors_key = f'vscode_errors_{today}'
-    clients_key = f'vscode_clients_{today}'
-    
-    # Get values from cache
-    action_count = cache.get(actions_key, 0)
-    selection_count = cache.get(selections_key, 0)
-    file_count = cache.get(files_key, 0)
-    error_count = cache.get(errors_key, 0)
-    client_set = cache.get(clients_key, set())
-    
-    # Only update if we have data
-    if action_count or selection_count or file_count or error_count or client_set:
-        with transaction.atomic():
-            obj, created = VSCodeExtensionMetrics.objects.get_or_create(date=today)
-            
-            obj.total_actions += action_count
-            obj.selection_shares += selection_count
-            obj.file_shares += file_count
-            obj.error_count += error_count
-            
-            # Update unique clients if we have client data
-            if client_set:
-                obj.unique_clients = len(client_set)
+    for day in _flush_days():
+        # Get all VS Code metrics from cache
+        actions_key = f'vscode_actions_{day}'
+        selections_key = f'vscode_selections_{day}'
+        files_key = f'vscode_files_{day}'
+        errors_key = f'vscode_errors_{day}'
+        clients_key = f'vscode_clients_{day}'
+        
+        # Get values from cache
+        action_count = counters.peek(actions_key)
+        selection_count = counters.peek(selections_key)
+        file_count = counters.peek(files_key)
+        error_count = counters.peek(errors_key)
+        client_count = counters.count_members(clients_key)
+        
+        # Only update if we have data
+        if action_count or selection_count or file_count or error_count or client_count:
+            with transaction.atomic():
+                VSCodeExtensionMetrics.objects.get_or_create(date=day)
+                updates = {
+                    'total_actions': F('total_actions') + action_count,
+                    'selection_shares': F('selection_shares') + selection_count,
+                    'file_shares': F('file_shares') + file_count,
+                    'error_count': F('error_count') + error_count,
+                }
+                # Update unique clients if we have client data
+                if client_count:
+                    updates['unique_clients'] = client_count
+                VSCodeExtensionMetrics.objects.filter(date=day).update(**updates)
                 
-            obj.save()
-            
-        # Clear cache after saving
-        cache.delete(actions_key)
-        cache.delete(selections_key)
-        cache.delete(files_key)
-        cache.delete(errors_key)
-        cache.delete(clients_key)
+            # Subtract what was saved so increments made meanwhile carry over
+            counters.drain(actions_key, action_count)
+            counters.drain(selections_key, selection_count)
+            counters.drain(files_key, file_count)
+            counters.drain(errors_key, error_count)
+
+@shared_task
+def rollup_daily_metrics(days=1):
+    """
+    Refreshes the daily summary tables read by the snippet analytics endpoint.
+    Runs every few minutes for today's partial row, and once after midnight
+    with days=2 to finalise yesterday.
+    """
+    call_command('rollup_daily_metrics', days=days)
+    return True
 
 @shared_task
 def flush_all_metrics():
@@ -115,8 +127,9 @@ def aggregate_client_metrics():
     yesterday = (timezone.now() - timedelta(days=1)).date()
     
     # Get telemetry events from yesterday
+    start, end = SnippetDailyMetrics.day_bounds(yesterday)
     events = VSCodeTelemetryEvent.objects.filter(
-        timestamp__date=yesterday
+        timestamp__gte=start, timestamp__lt=end
     )
     
     # Example: Get most active clients
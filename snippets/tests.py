@@ -1,3 +1,76 @@
+from datetime import timedelta
+
 from django.test import TestCase
+from django.utils import timezone
+
+from .models import Snippet, SnippetDailyMetrics, SnippetView, SnippetViewDailyMetrics
+
+
+def make_snippet(created_at, **fields):
+    """Create a snippet backdated to ``created_at`` (created_at is auto_now_add)"""
+    fields.setdefault('content', 'print("hello")')
+    fields.setdefault('language', 'python')
+    snippet = Snippet.objects.create(expires_at=created_at + timedelta(days=30), **fields)
+    Snippet.objects.filter(pk=snippet.pk).update(created_at=created_at)
+    return snippet
+
+
+class SnippetDailyMetricsRollupTests(TestCase):
+    def setUp(self):
+        self.day = timezone.localdate() - timedelta(days=3)
+        self.start, _ = SnippetDailyMetrics.day_bounds(self.day)
+
+    def test_rollup_counts_snippets_per_language(self):
+        make_snippet(self.start + timedelta(hours=1), content='x' * 50, view_count=4)
+        make_snippet(self.start + timedelta(hours=2), content='x' * 700,
+                     is_encrypted=True, one_time_view=True, view_count=1)
+        make_snippet(self.start + timedelta(hours=3), language='go', content='x' * 20000,
+                     password_hash='hash')
+        # Outside the day on either side
+        make_snippet(self.start - timedelta(seconds=1))
+        make_snippet(self.start + timedelta(days=1))
+
+        SnippetDailyMetrics.rollup(self.day)
+
+        rows = {row.language: row for row in SnippetDailyMetrics.objects.filter(date=self.day)}
+        self.assertEqual(set(rows), {'python', 'go'})
+
+        python = rows['python']
+        self.assertEqual(python.created, 2)
+        self.assertEqual(python.encrypted, 1)
+        self.assertEqual(python.one_time, 1)
+        self.assertEqual(python.password_protected, 0)
+        self.assertEqual(python.views_total, 5)
+        self.assertEqual(python.length_total, 750)
+        self.assertEqual((python.length_min, python.length_max), (50, 700))
+        self.assertEqual((python.very_short, python.short, python.medium), (1, 0, 1))
+
+        go = rows['go']
+        self.assertEqual(go.created, 1)
+        self.assertEqual(go.password_protected, 1)
+        self.assertEqual(go.very_long, 1)
+
+    def test_rollup_replaces_previous_rows(self):
+        make_snippet(self.start + timedelta(hours=1), language='rust')
+        SnippetDailyMetrics.rollup(self.day)
+        Snippet.objects.all().delete()
+        make_snippet(self.start + timedelta(hours=1))
+
+        SnippetDailyMetrics.rollup(self.day)
+
+        self.assertEqual(
+            list(SnippetDailyMetrics.objects.filter(date=self.day).values_list('language', 'created')),
+            [('python', 1)],
+        )
+
+    def test_view_rollup_counts_views_by_view_day(self):
+        snippet = make_snippet(self.start)
+        for offset in (timedelta(hours=1), timedelta(hours=5), timedelta(days=1, hours=1)):
+            view = SnippetView.objects.create(snippet=snippet, ip_hash='a' * 64, user_agent='test')
+            SnippetView.objects.filter(pk=view.pk).update(viewed_at=self.start + offset)
+
+        SnippetViewDailyMetrics.rollup(self.day)
+        SnippetViewDailyMetrics.rollup(self.day + timedelta(days=1))
 
-# Create your tests here.
+        self.assertEqual(SnippetViewDailyMetrics.objects.get(date=self.day).views, 2)
+        self.assertEqual(SnippetViewDailyMetrics.objects.get(date=self.day + timedelta(days=1)).views, 1)